@@ -8,6 +8,8 @@ Exporta:
 - DEFAULT_MAPPING: mapeamento padrão por prefixo nível 4
 - SPECIFIC_ACCOUNT_MAPPING: refinamentos por conta exata
 - CLASSIFICATION_TO_DF: classificação → grupo DF (DRE/BP)
+- classify_by_prefix: casamento de código completo contra DEFAULT_MAPPING
+- resolve: cadeia SPECIFIC → DEFAULT memoizada por código de conta
 - DEPARAManager: classe principal de gestão do DEPARA
 - classify_new_accounts: classificação via IA (Gemini)
 """
@@ -17,6 +19,8 @@ from backend.classifier.default_mapping import (
     CLASSIFICATION_TO_DF,
     DEFAULT_MAPPING,
     SPECIFIC_ACCOUNT_MAPPING,
+    classify_by_prefix,
+    resolve,
 )
 from backend.classifier.depara_manager import DEPARAManager
 
@@ -24,6 +28,8 @@ __all__ = [
     "DEFAULT_MAPPING",
     "SPECIFIC_ACCOUNT_MAPPING",
     "CLASSIFICATION_TO_DF",
+    "classify_by_prefix",
+    "resolve",
     "DEPARAManager",
     "classify_new_accounts",
 ]
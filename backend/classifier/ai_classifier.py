@@ -9,13 +9,31 @@ padrão nem pelo mapeamento específico.
 from __future__ import annotations
 
 import asyncio
+import functools
 import json
 import logging
 import os
+import random
+import re
 from typing import Any
 
 from google import genai
 from google.genai import types
+from pydantic import BaseModel
+
+from backend.classifier import cache as disk_cache
+from backend.classifier.default_mapping import (
+    DEFAULT_MAPPING_PAIR,
+    SPECIFIC_ACCOUNT_PAIR,
+)
+
+try:
+    import orjson
+
+    _json_loads = orjson.loads
+except ImportError:  # pragma: no cover - orjson é opcional
+    orjson = None  # type: ignore[assignment]
+    _json_loads = json.loads
 
 logger = logging.getLogger(__name__)
 
@@ -24,10 +42,15 @@ logger = logging.getLogger(__name__)
 # ---------------------------------------------------------------------------
 
 _MODEL = "gemini-2.5-flash"
-_BATCH_SIZE = 20
+_BATCH_SIZE = 20  # teto de contas por chamada
+_TARGET_INPUT_TOKENS = 3000  # orçamento de tokens de entrada por batch
+_MAX_CONCURRENCY = 8  # chamadas simultâneas ao Gemini (evita rajada de 429)
 _MAX_RETRIES = 2
 _TIMEOUT_SECONDS = 30
 _TEMPERATURE = 0.0
+_RETRY_TEMPERATURE = 0.1  # quebra repetição exata após JSON malformado
+_CACHE_TTL = "600s"  # TTL do prompt-cache explícito no Gemini
+_MEMO_MAXSIZE = 4096  # entradas máximas no memo em memória de classificações
 
 # ---------------------------------------------------------------------------
 # Prompt
@@ -78,29 +101,146 @@ o JSON. Retorne SOMENTE o array JSON puro.
 """
 
 
-def _build_user_prompt(
-    accounts: list[dict[str, str]],
-    existing_classifications: list[str],
-) -> str:
-    """Monta o prompt do usuário com contas e classificações existentes."""
+@functools.lru_cache(maxsize=8)
+def _classif_block_cached(existing_classifications: tuple[str, ...]) -> str:
+    """Monta (e memoiza) o bloco de classificações existentes."""
     classif_list = "\n".join(f"- {c}" for c in existing_classifications)
+    return f"## Classificações existentes\n\n{classif_list}"
+
+
+def _build_classifications_block(existing_classifications: list[str]) -> str:
+    """Monta o bloco de classificações existentes (parte estável do prompt)."""
+    return _classif_block_cached(tuple(existing_classifications))
 
-    accounts_json = json.dumps(accounts, ensure_ascii=False, indent=2)
 
+def _build_accounts_block(accounts: list[dict[str, str]]) -> str:
+    """Monta o bloco com as contas a classificar (parte variável do prompt).
+
+    JSON compacto (sem indentação): menos bytes na rede e menos tokens
+    de entrada cobrados pelo Gemini.
+    """
+    if orjson is not None:
+        accounts_json = orjson.dumps(accounts).decode()
+    else:
+        accounts_json = json.dumps(
+            accounts, ensure_ascii=False, separators=(",", ":")
+        )
     return (
-        "## Classificações existentes\n\n"
-        f"{classif_list}\n\n"
         "## Contas para classificar\n\n"
         f"{accounts_json}\n\n"
         "Classifique cada conta acima seguindo as regras do sistema."
     )
 
 
+def _build_user_prompt(
+    accounts: list[dict[str, str]],
+    existing_classifications: list[str],
+) -> str:
+    """Monta o prompt do usuário com contas e classificações existentes."""
+    return (
+        f"{_build_classifications_block(existing_classifications)}\n\n"
+        f"{_build_accounts_block(accounts)}"
+    )
+
+
+async def _create_prompt_cache(
+    client: genai.Client, existing_classifications: list[str]
+) -> str | None:
+    """Cria um cache explícito de prompt no Gemini para o conteúdo estável.
+
+    O system instruction e a lista de classificações existentes são iguais
+    em todos os batches de uma mesma classificação — cacheá-los no servidor
+    evita reenviar (e re-tokenizar/cobrar) esses tokens a cada chamada.
+    Usa a superfície assíncrona do SDK (``client.aio``), como as chamadas
+    de geração — a variante síncrona bloquearia o event loop por um round
+    trip inteiro.
+
+    Returns:
+        Nome do cache criado, ou ``None`` se a criação falhar (a chamada
+        segue funcionando sem cache, apenas menos eficiente).
+    """
+    try:
+        cache = await client.aio.caches.create(
+            model=_MODEL,
+            config=types.CreateCachedContentConfig(
+                system_instruction=_SYSTEM_INSTRUCTION,
+                contents=[_build_classifications_block(existing_classifications)],
+                ttl=_CACHE_TTL,
+            ),
+        )
+        name = getattr(cache, "name", None)
+        if isinstance(name, str) and name:
+            logger.info("Prompt-cache criado: %s", name)
+            return name
+    except Exception as exc:
+        logger.warning("Falha ao criar prompt-cache (seguindo sem): %s", exc)
+    return None
+
+
 # ---------------------------------------------------------------------------
 # Parsing da resposta
 # ---------------------------------------------------------------------------
 
 
+class _AiResult(BaseModel):
+    """Schema de um item da resposta — passado ao Gemini via response_schema."""
+
+    codigo_conta: str = ""
+    classificacao_sugerida: str = "Não Classificada"
+    confianca: str = "baixa"
+    justificativa: str = ""
+    grupo_df: str = ""
+    is_new_classification: bool = False
+
+
+def _results_from_parsed(parsed: Any) -> list[dict[str, Any]] | None:
+    """Converte ``response.parsed`` (schema aplicado) em dicts de resultado.
+
+    Retorna ``None`` quando o SDK não produziu a lista tipada (p.ex.
+    schema ignorado pelo modelo) — o caller cai no parse do texto bruto.
+    """
+    if not isinstance(parsed, list) or not parsed:
+        return None
+    results: list[dict[str, Any]] = []
+    for item in parsed:
+        if isinstance(item, _AiResult):
+            results.append(item.model_dump())
+        else:
+            return None
+    return results
+
+
+# Parâmetros de config idênticos em toda chamada, montados uma única vez
+# no import (o SDK exige o system instruction como str — não há o que
+# pré-codificar em bytes do nosso lado).
+_BASE_CONFIG_KWARGS: dict[str, Any] = {
+    "response_mime_type": "application/json",
+    "response_schema": list[_AiResult],
+}
+
+
+# Com response_mime_type="application/json" o Gemini não deveria emitir
+# fences — este é um caminho defensivo, barato quando não dispara.
+_FENCE_RE = re.compile(r"^```(?:json)?\s*\n(.*?)\n?```\s*$", re.DOTALL)
+
+
+def _strip_fence(text: str) -> str:
+    """Remove fences markdown (```json ... ```) envolvendo a resposta."""
+    if not text.startswith("```"):
+        return text
+    match = _FENCE_RE.match(text)
+    return match.group(1) if match else text
+
+
+def _norm_str(value: Any, default: str = "") -> str:
+    """Coage ``value`` para str, usando ``default`` quando ausente."""
+    if isinstance(value, str):
+        return value
+    if value is None:
+        return default
+    return str(value)
+
+
 def _parse_response(
     raw_text: str, accounts: list[dict[str, str]]
 ) -> list[dict[str, Any]]:
@@ -118,39 +258,70 @@ def _parse_response(
     Raises:
         ValueError: Se o JSON não puder ser parseado.
     """
-    text = raw_text.strip()
-
-    # Remove possíveis fences ```json ... ```
-    if text.startswith("```"):
-        lines = text.split("\n")
-        # Remove primeira e última linhas (```json e ```)
-        lines = [ln for ln in lines if not ln.strip().startswith("```")]
-        text = "\n".join(lines).strip()
+    text = _strip_fence(raw_text.strip())
 
-    parsed = json.loads(text)
+    parsed = _json_loads(text)
 
     if not isinstance(parsed, list):
         raise ValueError(f"Resposta esperada é array JSON, recebeu: {type(parsed)}")
 
-    # Valida e normaliza cada item
-    results: list[dict[str, Any]] = []
-    for item in parsed:
-        results.append(
-            {
-                "codigo_conta": str(item.get("codigo_conta", "")),
-                "classificacao_sugerida": str(
-                    item.get("classificacao_sugerida", "Não Classificada")
-                ),
-                "confianca": str(item.get("confianca", "baixa")),
-                "justificativa": str(item.get("justificativa", "")),
-                "grupo_df": str(item.get("grupo_df", "")),
-                "is_new_classification": bool(
-                    item.get("is_new_classification", False)
-                ),
-            }
-        )
+    # Valida e normaliza cada item. Com response_mime_type="application/json"
+    # os campos já chegam como str/bool — _norm_str só coage os desviantes.
+    return [
+        {
+            "codigo_conta": _norm_str(item.get("codigo_conta")),
+            "classificacao_sugerida": _norm_str(
+                item.get("classificacao_sugerida"), "Não Classificada"
+            ),
+            "confianca": _norm_str(item.get("confianca"), "baixa"),
+            "justificativa": _norm_str(item.get("justificativa")),
+            "grupo_df": _norm_str(item.get("grupo_df")),
+            "is_new_classification": bool(item.get("is_new_classification", False)),
+        }
+        for item in parsed
+    ]
+
+
+@functools.lru_cache(maxsize=1)
+def _get_client(api_key: str) -> genai.Client:
+    """Retorna um client compartilhado do google-genai.
+
+    Construir o client abre pool de conexões e sessão TLS — reutilizar a
+    mesma instância entre invocações permite keep-alive/multiplexação.
+    Rotação de chave: ``_get_client.cache_clear()``.
+    """
+    return genai.Client(api_key=api_key)
 
-    return results
+
+def _retry_delay(exc: Exception | None, attempt: int) -> float:
+    """Calcula o tempo de espera antes do próximo retry.
+
+    Política por classe de erro:
+    - quota (HTTP 429): honra o ``retryDelay`` informado pela API; sem
+      ele, backoff mais conservador;
+    - timeout: backoff mais longo (o serviço está lento, não fora do ar);
+    - demais erros: backoff exponencial padrão.
+
+    Todos os tempos levam jitter aleatório (±50%) para que os batches do
+    ``asyncio.gather`` não re-tentem sincronizados.
+    """
+    if exc is not None and getattr(exc, "code", None) == 429:
+        details = getattr(exc, "details", None)
+        if isinstance(details, dict):
+            for detail in details.get("error", {}).get("details", []):
+                delay = detail.get("retryDelay", "")
+                if isinstance(delay, str) and delay.endswith("s"):
+                    try:
+                        return float(delay[:-1])
+                    except ValueError:
+                        pass
+        # Sem Retry-After explícito: backoff mais conservador para quota
+        base = float(2 ** (attempt + 1))
+    elif isinstance(exc, (TimeoutError, asyncio.TimeoutError)):
+        base = float(2 ** (attempt + 1))
+    else:
+        base = float(2 ** attempt)
+    return base * random.uniform(0.5, 1.5)
 
 
 # ---------------------------------------------------------------------------
@@ -162,29 +333,28 @@ def _make_error_results(
     accounts: list[dict[str, str]], error_msg: str
 ) -> list[dict[str, Any]]:
     """Gera resultados de erro para contas que não puderam ser classificadas."""
+    # Campos idênticos entre os itens são montados uma vez fora do loop.
+    justificativa = f"Erro IA: {error_msg}"
+    grupo_get = _GRUPO_LUT.get
     return [
         {
-            "codigo_conta": acc.get("codigo_conta", ""),
+            "codigo_conta": (codigo := acc.get("codigo_conta", "")),
             "classificacao_sugerida": "Não Classificada",
             "confianca": "baixa",
-            "justificativa": f"Erro IA: {error_msg}",
-            "grupo_df": _infer_grupo_df(acc.get("codigo_conta", "")),
+            "justificativa": justificativa,
+            "grupo_df": grupo_get(codigo[:1], ""),
             "is_new_classification": False,
         }
         for acc in accounts
     ]
 
 
+_GRUPO_LUT = {"1": "BP", "2": "BP", "3": "DRE", "4": "DRE"}
+
+
 def _infer_grupo_df(codigo_conta: str) -> str:
     """Infere o grupo DF pelo primeiro dígito da conta."""
-    if not codigo_conta:
-        return ""
-    first = codigo_conta[0]
-    if first in ("1", "2"):
-        return "BP"
-    if first in ("3", "4"):
-        return "DRE"
-    return ""
+    return _GRUPO_LUT.get(codigo_conta[:1], "")
 
 
 # ---------------------------------------------------------------------------
@@ -196,6 +366,7 @@ async def _call_gemini(
     client: genai.Client,
     accounts: list[dict[str, str]],
     existing_classifications: list[str],
+    cached_content: str | None = None,
 ) -> list[dict[str, Any]]:
     """Faz uma chamada ao Gemini para classificar um batch de contas.
 
@@ -205,19 +376,35 @@ async def _call_gemini(
         client: Client do google-genai.
         accounts: Batch de contas (até _BATCH_SIZE).
         existing_classifications: Lista de classificações existentes.
+        cached_content: Nome de um prompt-cache explícito contendo o system
+            instruction e as classificações. Se ``None``, tudo é enviado
+            inline a cada chamada.
 
     Returns:
         Lista de dicts com classificações sugeridas.
     """
-    user_prompt = _build_user_prompt(accounts, existing_classifications)
+    if cached_content:
+        # System instruction + classificações já estão no cache do servidor:
+        # envia só o bloco variável de contas.
+        user_prompt = _build_accounts_block(accounts)
+    else:
+        user_prompt = _build_user_prompt(accounts, existing_classifications)
+
+    def _make_config(temperature: float) -> types.GenerateContentConfig:
+        kwargs: dict[str, Any] = {
+            **_BASE_CONFIG_KWARGS,
+            "temperature": temperature,
+        }
+        if cached_content:
+            kwargs["cached_content"] = cached_content
+        else:
+            kwargs["system_instruction"] = _SYSTEM_INSTRUCTION
+        return types.GenerateContentConfig(**kwargs)
 
-    config = types.GenerateContentConfig(
-        system_instruction=_SYSTEM_INSTRUCTION,
-        temperature=_TEMPERATURE,
-        response_mime_type="application/json",
-    )
+    config = _make_config(_TEMPERATURE)
 
     last_error: Exception | None = None
+    json_failures = 0
 
     for attempt in range(_MAX_RETRIES + 1):
         try:
@@ -228,6 +415,9 @@ async def _call_gemini(
                 len(accounts),
             )
 
+            # Chamada unária de propósito: a resposta é um array JSON único
+            # que só é válido completo — streaming não anteciparia nenhum
+            # resultado utilizável e quebraria o retry sobre payload inteiro.
             response = await asyncio.wait_for(
                 client.aio.models.generate_content(
                     model=_MODEL,
@@ -237,13 +427,17 @@ async def _call_gemini(
                 timeout=_TIMEOUT_SECONDS,
             )
 
-            raw_text = response.text
-            if not raw_text:
-                raise ValueError("Resposta vazia do Gemini.")
+            # Caminho rápido: o SDK já validou/tipou a resposta pelo schema
+            results = _results_from_parsed(getattr(response, "parsed", None))
+
+            if results is None:
+                raw_text = response.text
+                if not raw_text:
+                    raise ValueError("Resposta vazia do Gemini.")
 
-            logger.debug("Resposta bruta do Gemini: %s", raw_text[:500])
+                logger.debug("Resposta bruta do Gemini: %s", raw_text[:500])
 
-            results = _parse_response(raw_text, accounts)
+                results = _parse_response(raw_text, accounts)
 
             logger.info(
                 "Gemini classificou %d contas com sucesso.", len(results)
@@ -261,12 +455,19 @@ async def _call_gemini(
             )
         except json.JSONDecodeError as exc:
             last_error = exc
+            json_failures += 1
             logger.warning(
                 "Erro ao parsear JSON na tentativa %d/%d: %s",
                 attempt + 1,
                 _MAX_RETRIES + 1,
                 exc,
             )
+            if json_failures >= 2:
+                # Já re-tentou com temperatura maior e continuou malformado:
+                # insistir só queima quota.
+                break
+            # Temperatura levemente maior quebra a repetição exata do modelo
+            config = _make_config(_RETRY_TEMPERATURE)
         except Exception as exc:
             last_error = exc
             logger.warning(
@@ -276,10 +477,10 @@ async def _call_gemini(
                 exc,
             )
 
-        # Backoff exponencial entre retries
+        # Backoff exponencial entre retries (ou Retry-After em caso de 429)
         if attempt < _MAX_RETRIES:
-            wait = 2 ** attempt
-            logger.info("Aguardando %ds antes de retry...", wait)
+            wait = _retry_delay(last_error, attempt)
+            logger.info("Aguardando %.1fs antes de retry...", wait)
             await asyncio.sleep(wait)
 
     # Todas as tentativas falharam
@@ -292,6 +493,100 @@ async def _call_gemini(
     return _make_error_results(accounts, error_msg)
 
 
+def _estimate_tokens(account: dict[str, str]) -> int:
+    """Estimativa grosseira de tokens de uma conta (~4 chars por token)."""
+    return len(json.dumps(account, ensure_ascii=False)) // 4
+
+
+def _make_batches(
+    accounts: list[dict[str, str]],
+) -> list[list[dict[str, str]]]:
+    """Agrupa contas em batches por orçamento de tokens.
+
+    Preenche cada batch até ``_TARGET_INPUT_TOKENS`` estimados (contas
+    curtas → batches maiores amortizam o overhead fixo por chamada;
+    contas longas → batches menores evitam truncamento/timeout), sempre
+    respeitando o teto de ``_BATCH_SIZE`` contas.
+    """
+    batches: list[list[dict[str, str]]] = []
+    current: list[dict[str, str]] = []
+    current_tokens = 0
+
+    for acc in accounts:
+        tokens = _estimate_tokens(acc)
+        if current and (
+            len(current) >= _BATCH_SIZE
+            or current_tokens + tokens > _TARGET_INPUT_TOKENS
+        ):
+            batches.append(current)
+            current = []
+            current_tokens = 0
+        current.append(acc)
+        current_tokens += tokens
+
+    if current:
+        batches.append(current)
+    return batches
+
+
+def _resolve_deterministic(account: dict[str, str]) -> dict[str, Any] | None:
+    """Resolve uma conta pelos mapeamentos fixos, sem IA.
+
+    Este módulo é o fallback para contas fora de DEFAULT_MAPPING /
+    SPECIFIC_ACCOUNT_MAPPING, mas nada impede o caller de passar contas
+    resolvíveis — o pré-filtro garante que essas nunca gastem uma chamada
+    ao Gemini.
+    """
+    codigo = str(account.get("codigo_conta", ""))
+    pair = SPECIFIC_ACCOUNT_PAIR.get(codigo)
+    if pair is None:
+        nivel4 = str(account.get("grupo_nivel4", ""))
+        pair = DEFAULT_MAPPING_PAIR.get(nivel4) if nivel4 else None
+    if pair is None:
+        return None
+    cls, grupo_df = pair
+    return {
+        "codigo_conta": codigo,
+        "classificacao_sugerida": cls,
+        "confianca": "alta",
+        "justificativa": "Resolvida pelo mapeamento padrão (sem IA).",
+        "grupo_df": grupo_df or _infer_grupo_df(codigo),
+        "is_new_classification": False,
+    }
+
+
+# ---------------------------------------------------------------------------
+# Memoização em memória
+# ---------------------------------------------------------------------------
+
+# Os mesmos códigos de conta reaparecem mês a mês: memoizar o resultado da
+# IA por (conta, título, nível-4, classificações) evita rechamar o Gemini
+# para contas já vistas nesta execução do processo.
+_memo: dict[tuple[str, str, str, tuple[str, ...]], dict[str, Any]] = {}
+
+
+def _memo_key(
+    account: dict[str, str], classif_key: tuple[str, ...]
+) -> tuple[str, str, str, tuple[str, ...]]:
+    """Chave estável de memoização para uma conta."""
+    return (
+        str(account.get("codigo_conta", "")),
+        str(account.get("titulo_conta", "")),
+        str(account.get("grupo_nivel4", "")),
+        classif_key,
+    )
+
+
+def _is_cacheable(result: dict[str, Any]) -> bool:
+    """Resultados de erro não devem ser memoizados (permitir nova tentativa)."""
+    return not str(result.get("justificativa", "")).startswith("Erro IA")
+
+
+def clear_memo() -> None:
+    """Limpa o memo em memória (útil em testes e rotação de prompt)."""
+    _memo.clear()
+
+
 # ---------------------------------------------------------------------------
 # Função pública
 # ---------------------------------------------------------------------------
@@ -339,39 +634,127 @@ async def classify_new_accounts(
             "Defina-a antes de usar o classificador por IA."
         )
 
-    client = genai.Client(api_key=api_key)
+    # Canonicaliza as classificações (ordenadas, sem duplicatas): todos os
+    # batches — e invocações sucessivas — compartilham exatamente o mesmo
+    # prefixo de prompt, maximizando acertos do prefix-cache do provedor
+    # e a estabilidade das chaves de memoização.
+    existing_classifications = sorted(set(existing_classifications))
+
+    # Dedup + memo: só vão para o Gemini contas ainda não vistas.
+    classif_key = tuple(existing_classifications)
+    account_keys = [_memo_key(acc, classif_key) for acc in accounts]
+
+    # Eviction antes de tocar nas chaves desta invocação: limpar o memo no
+    # meio do loop de gravação descartaria hits (determinísticos/disco)
+    # registrados nesta mesma chamada e furaria a saída.
+    if len(_memo) >= _MEMO_MAXSIZE:
+        _memo.clear()
+
+    # Todo resultado desta invocação — hit de memo, mapeamento fixo, cache
+    # em disco ou resposta do Gemini — vai para key_results: a remontagem
+    # da saída depende só dele, nunca do _memo compartilhado.
+    key_results: dict[tuple[str, str, str, tuple[str, ...]], dict[str, Any]] = {}
+    misses: list[
+        tuple[tuple[str, str, str, tuple[str, ...]], str, dict[str, str]]
+    ] = []
+    seen: set[tuple[str, str, str, tuple[str, ...]]] = set()
+    for key, acc in zip(account_keys, accounts):
+        if key in key_results or key in seen:
+            continue
+        hit = _memo.get(key)
+        if hit is not None:
+            key_results[key] = hit
+            continue
+        # Contas resolvíveis pelos mapeamentos fixos nunca vão à IA
+        det = _resolve_deterministic(acc)
+        if det is not None:
+            key_results[key] = _memo[key] = det
+            continue
+        # Consulta o cache persistente antes de considerar a conta um miss
+        disk_key = disk_cache.make_key(acc, classif_key)
+        cached = disk_cache.get(disk_key)
+        if cached is not None:
+            key_results[key] = _memo[key] = cached
+            continue
+        seen.add(key)
+        misses.append((key, disk_key, acc))
+
+    if misses:
+        client = _get_client(api_key)
+        to_classify = [acc for _, _, acc in misses]
+
+        # Divide em batches por orçamento de tokens (teto de _BATCH_SIZE)
+        batches = _make_batches(to_classify)
+
+        logger.info(
+            "Classificando %d contas em %d batch(es) (%d do cache)...",
+            len(to_classify),
+            len(batches),
+            len(accounts) - len(to_classify),
+        )
 
-    # Divide em batches
-    batches: list[list[dict[str, str]]] = [
-        accounts[i : i + _BATCH_SIZE]
-        for i in range(0, len(accounts), _BATCH_SIZE)
-    ]
+        # Cacheia o conteúdo estável (system instruction + classificações) no
+        # servidor quando há mais de um batch — um só upload para todos eles.
+        cached_content: str | None = None
+        if len(batches) > 1:
+            cached_content = await _create_prompt_cache(
+                client, existing_classifications
+            )
 
-    logger.info(
-        "Classificando %d contas em %d batch(es)...",
-        len(accounts),
-        len(batches),
-    )
+        # Processa batches em paralelo, limitando a concorrência para não
+        # estourar a quota de QPS da API (rajadas de 429 serializam a fila).
+        sem = asyncio.Semaphore(_MAX_CONCURRENCY)
+
+        async def _bounded_call(
+            batch: list[dict[str, str]],
+        ) -> list[dict[str, Any]]:
+            async with sem:
+                return await _call_gemini(
+                    client, batch, existing_classifications, cached_content
+                )
+
+        tasks = [_bounded_call(batch) for batch in batches]
+        batch_results = await asyncio.gather(*tasks)
+
+        # Associa cada item da resposta à sua conta pelo codigo_conta: o
+        # modelo não garante um item por conta nem a ordem de entrada, e
+        # casar por posição gravaria a classificação de uma conta sob a
+        # chave (e o cache em disco) de outra. Contas sem item na resposta
+        # recebem resultado de erro — que não é memoizado nem persistido.
+        idx = 0
+        for batch, batch_result in zip(batches, batch_results):
+            by_codigo: dict[str, dict[str, Any]] = {}
+            for res in batch_result:
+                by_codigo.setdefault(str(res.get("codigo_conta", "")), res)
+            for key, disk_key, acc in misses[idx : idx + len(batch)]:
+                res = by_codigo.get(str(acc.get("codigo_conta", "")))
+                if res is None:
+                    res = _make_error_results(
+                        [acc], "resposta sem item para a conta"
+                    )[0]
+                key_results[key] = res
+                if _is_cacheable(res):
+                    _memo[key] = res
+                    disk_cache.put(disk_key, res)
+            idx += len(batch)
+    else:
+        logger.info(
+            "Todas as %d contas resolvidas pelo cache em memória.", len(accounts)
+        )
 
-    # Processa batches em paralelo
-    tasks = [
-        _call_gemini(client, batch, existing_classifications)
-        for batch in batches
+    # Remonta a saída na ordem de entrada: toda conta de entrada tem uma
+    # entrada em key_results, então nenhuma some da resposta.
+    output: list[dict[str, Any]] = [
+        dict(key_results[key]) for key in account_keys
     ]
-    batch_results = await asyncio.gather(*tasks)
-
-    # Concatena resultados
-    all_results: list[dict[str, Any]] = []
-    for batch_result in batch_results:
-        all_results.extend(batch_result)
 
     classified = sum(
-        1 for r in all_results if r["classificacao_sugerida"] != "Não Classificada"
+        1 for r in output if r["classificacao_sugerida"] != "Não Classificada"
     )
     logger.info(
         "Classificação IA concluída: %d/%d contas classificadas.",
         classified,
-        len(all_results),
+        len(output),
     )
 
-    return all_results
+    return output
@@ -0,0 +1,141 @@
+"""
+Cache persistente em disco para classificações da IA.
+
+Os mesmos códigos de conta reaparecem a cada balancete mensal — persistir
+o resultado do Gemini em disco faz execuções subsequentes do app pularem
+a API por completo para contas já vistas (o memo em memória só vive
+enquanto o processo vive).
+
+Implementado sobre ``sqlite3`` da stdlib (sem dependência externa), com
+chaves content-addressed (blake2b) e namespace versionado: mudar
+``_CACHE_VERSION`` quando o system prompt mudar invalida as entradas
+antigas. Todas as operações são resilientes — falha de I/O degrada para
+"sem cache", nunca para erro.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+# Versão do namespace: incrementar quando o system prompt / formato do
+# resultado mudar, para invalidar entradas antigas.
+_CACHE_VERSION = "v1"
+_TTL_SECONDS = 30 * 24 * 3600  # 30 dias
+_ENV_CACHE_DIR = "AF_RELATORIO_CACHE_DIR"
+_DB_FILENAME = "ai_classifier.sqlite3"
+
+_lock = threading.Lock()
+_conn: sqlite3.Connection | None = None
+
+
+def _cache_path() -> str:
+    """Resolve o caminho do banco (override via AF_RELATORIO_CACHE_DIR)."""
+    cache_dir = os.environ.get(_ENV_CACHE_DIR) or os.path.join(
+        os.path.expanduser("~"), ".cache", "af-relatorio"
+    )
+    return os.path.join(cache_dir, _DB_FILENAME)
+
+
+def _get_conn() -> sqlite3.Connection | None:
+    """Abre (uma vez) a conexão sqlite; ``None`` se o disco não cooperar."""
+    global _conn
+    if _conn is not None:
+        return _conn
+    try:
+        path = _cache_path()
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        conn = sqlite3.connect(path, check_same_thread=False)
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS classifications ("
+            "  key TEXT PRIMARY KEY,"
+            "  value TEXT NOT NULL,"
+            "  created REAL NOT NULL"
+            ")"
+        )
+        conn.commit()
+        _conn = conn
+        return _conn
+    except (sqlite3.Error, OSError) as exc:
+        logger.warning("Cache em disco indisponível: %s", exc)
+        return None
+
+
+def make_key(
+    account: dict[str, str], existing_classifications: tuple[str, ...]
+) -> str:
+    """Chave content-addressed e estável para uma conta.
+
+    A lista de classificações entra ordenada para que a mesma lista em
+    ordens diferentes produza a mesma chave.
+    """
+    raw = "|".join(
+        (
+            str(account.get("codigo_conta", "")),
+            str(account.get("titulo_conta", "")),
+            str(account.get("grupo_nivel4", "")),
+            ",".join(sorted(existing_classifications)),
+        )
+    )
+    digest = hashlib.blake2b(raw.encode("utf-8"), digest_size=16).hexdigest()
+    return f"{_CACHE_VERSION}:{digest}"
+
+
+def get(key: str) -> dict[str, Any] | None:
+    """Busca uma classificação no cache; ``None`` se ausente ou expirada."""
+    conn = _get_conn()
+    if conn is None:
+        return None
+    try:
+        with _lock:
+            row = conn.execute(
+                "SELECT value, created FROM classifications WHERE key = ?",
+                (key,),
+            ).fetchone()
+        if row is None:
+            return None
+        value, created = row
+        if time.time() - created > _TTL_SECONDS:
+            return None
+        result = json.loads(value)
+        return result if isinstance(result, dict) else None
+    except (sqlite3.Error, ValueError) as exc:
+        logger.warning("Falha ao ler cache em disco: %s", exc)
+        return None
+
+
+def put(key: str, result: dict[str, Any]) -> None:
+    """Persiste uma classificação no cache (best-effort)."""
+    conn = _get_conn()
+    if conn is None:
+        return
+    try:
+        with _lock:
+            conn.execute(
+                "INSERT OR REPLACE INTO classifications (key, value, created) "
+                "VALUES (?, ?, ?)",
+                (key, json.dumps(result, ensure_ascii=False), time.time()),
+            )
+            conn.commit()
+    except (sqlite3.Error, ValueError) as exc:
+        logger.warning("Falha ao gravar cache em disco: %s", exc)
+
+
+def reset() -> None:
+    """Fecha a conexão atual (próximo acesso reabre — usado em testes)."""
+    global _conn
+    with _lock:
+        if _conn is not None:
+            try:
+                _conn.close()
+            except sqlite3.Error:
+                pass
+            _conn = None
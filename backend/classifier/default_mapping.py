@@ -15,6 +15,11 @@ Contém três dicionários:
 
 from __future__ import annotations
 
+import functools
+import sys
+from collections.abc import Mapping
+from types import MappingProxyType
+
 # ============================================================================
 # Mapeamento: código nível 4 → classificação
 # ============================================================================
@@ -147,3 +152,172 @@ CLASSIFICATION_TO_DF: dict[str, str] = {
     "(+) Reserva de Lucros": "BP",
     "(+) Lucros e Prejuízos Acumulados": "BP",
 }
+
+
+# ============================================================================
+# Congelamento e interning (pós-processamento no import)
+# ============================================================================
+
+
+def _frozen(mapping: dict[str, str]) -> Mapping[str, str]:
+    """Reconstrói o dict com strings internadas e o congela (somente leitura).
+
+    Interning torna comparações/lookups dos rótulos de classificação em
+    loops quentes comparações de ponteiro; MappingProxyType impede mutação
+    acidental dos mapeamentos compartilhados entre requests.
+    """
+    return MappingProxyType(
+        {sys.intern(k): sys.intern(v) for k, v in mapping.items()}
+    )
+
+
+DEFAULT_MAPPING = _frozen(DEFAULT_MAPPING)
+SPECIFIC_ACCOUNT_MAPPING = _frozen(SPECIFIC_ACCOUNT_MAPPING)
+CLASSIFICATION_TO_DF = _frozen(CLASSIFICATION_TO_DF)
+
+# Pares (classificação, grupo_df) pré-avaliados no import: um lookup em
+# vez de dois (mapeamento + CLASSIFICATION_TO_DF) por conta nos hot paths.
+SPECIFIC_ACCOUNT_PAIR: Mapping[str, tuple[str, str]] = MappingProxyType(
+    {
+        k: (v, CLASSIFICATION_TO_DF.get(v, ""))
+        for k, v in SPECIFIC_ACCOUNT_MAPPING.items()
+    }
+)
+DEFAULT_MAPPING_PAIR: Mapping[str, tuple[str, str]] = MappingProxyType(
+    {
+        k: (v, CLASSIFICATION_TO_DF.get(v, ""))
+        for k, v in DEFAULT_MAPPING.items()
+    }
+)
+
+
+# ============================================================================
+# Trie de segmentos (DEFAULT + SPECIFIC num único índice)
+# ============================================================================
+
+
+def _build_trie() -> dict[str, list]:
+    """Monta a trie de segmentos a partir de DEFAULT + SPECIFIC.
+
+    Cada nó é ``[classificação | None, filhos]``, indexado pelo segmento
+    entre pontos.  Como as chaves de ``SPECIFIC_ACCOUNT_MAPPING`` são mais
+    profundas que as de ``DEFAULT_MAPPING``, a prioridade específico >
+    genérico fica codificada na própria estrutura.
+    """
+    root: dict[str, list] = {}
+    for mapping in (DEFAULT_MAPPING, SPECIFIC_ACCOUNT_MAPPING):
+        for key, cls in mapping.items():
+            children = root
+            node: list | None = None
+            for seg in key.split("."):
+                node = children.setdefault(seg, [None, {}])
+                children = node[1]
+            node[0] = cls  # type: ignore[index]
+    return root
+
+
+_PREFIX_TRIE: dict[str, list] = _build_trie()
+
+
+def _classify_by_trie(codigo_conta: str) -> str | None:
+    """Longest-prefix-match do código na trie, segmento a segmento.
+
+    Caminha no máximo 5 passos e devolve a classificação do nó mais
+    profundo que carrega uma — um único índice substitui o lookup exato
+    em SPECIFIC mais a varredura de prefixos em DEFAULT.
+    """
+    children = _PREFIX_TRIE
+    best: str | None = None
+    for seg in codigo_conta.split("."):
+        node = children.get(seg)
+        if node is None:
+            break
+        if node[0] is not None:
+            best = node[0]
+        children = node[1]
+    return best
+
+
+def classify_by_prefix(codigo_conta: str) -> str | None:
+    """Retorna a classificação de ``DEFAULT_MAPPING`` cujo prefixo casa com o código.
+
+    Caminha a mesma trie de :func:`_classify_by_trie`, mas só até o
+    quarto segmento: as chaves de ``SPECIFIC_ACCOUNT_MAPPING`` têm
+    exatamente 5 segmentos (invariante coberta por teste), então o
+    passeio limitado enxerga apenas as entradas de ``DEFAULT_MAPPING``.
+    """
+    children = _PREFIX_TRIE
+    best: str | None = None
+    for seg in codigo_conta.split(".")[:4]:
+        node = children.get(seg)
+        if node is None:
+            break
+        if node[0] is not None:
+            best = node[0]
+        children = node[1]
+    return best
+
+
+# ============================================================================
+# Índice por inteiros empacotados (16 bits por segmento)
+# ============================================================================
+
+# Larguras canônicas dos segmentos ("1.01.01.02.00004"): o empacotamento
+# descarta zeros à esquerda, então "1.1" e "1.01" virariam o mesmo inteiro.
+# O caminho rápido só aceita códigos na forma canônica; o resto cai na trie.
+_SEG_WIDTHS = (1, 2, 2, 2, 5)
+
+
+def _pack(codigo: str) -> int:
+    """Empacota um código pontuado num inteiro: 16 bits por segmento.
+
+    ``"1.01.03.04"`` → segmentos ``(1, 1, 3, 4)`` nos bits 0–63.  Truncar
+    um código ao nível 4 ou 3 vira um AND com máscara, sem split/join.
+
+    Raises:
+        ValueError: Se algum segmento não for numérico, não estiver na
+            largura canônica de ``_SEG_WIDTHS`` ou houver mais de 5
+            segmentos.
+    """
+    partes = codigo.split(".")
+    if len(partes) > len(_SEG_WIDTHS):
+        raise ValueError(f"Código com mais de 5 segmentos: {codigo!r}")
+    v = 0
+    for i, parte in enumerate(partes):
+        if len(parte) != _SEG_WIDTHS[i]:
+            raise ValueError(f"Segmento fora da forma canônica: {parte!r}")
+        v |= (int(parte) & 0xFFFF) << (i * 16)
+    return v
+
+
+_DEFAULT_PACKED: dict[int, str] = {
+    _pack(k): v for k, v in DEFAULT_MAPPING.items()
+}
+_SPECIFIC_PACKED: dict[int, str] = {
+    _pack(k): v for k, v in SPECIFIC_ACCOUNT_MAPPING.items()
+}
+
+_LEVEL3_MASK = (1 << 48) - 1
+_LEVEL4_MASK = (1 << 64) - 1
+_LEVEL5_MASK = (1 << 80) - 1
+
+
+@functools.lru_cache(maxsize=4096)
+def resolve(codigo_conta: str) -> str | None:
+    """Resolve um código completo pela cadeia SPECIFIC → DEFAULT (memoizado).
+
+    O caminho rápido empacota o código num inteiro e faz três lookups
+    com truncamento por máscara (nível 5 → 4 → 3) — sem alocar nenhuma
+    string intermediária.  Códigos com segmentos não numéricos ou fora
+    da largura canônica (p.ex. ``"1.1"`` em vez de ``"1.01"``) caem na
+    trie de segmentos, que tem a mesma semântica de prioridade.
+    """
+    try:
+        p = _pack(codigo_conta)
+    except ValueError:
+        return _classify_by_trie(codigo_conta)
+    return (
+        _SPECIFIC_PACKED.get(p & _LEVEL5_MASK)
+        or _DEFAULT_PACKED.get(p & _LEVEL4_MASK)
+        or _DEFAULT_PACKED.get(p & _LEVEL3_MASK)
+    )
@@ -8,8 +8,12 @@ e marca contas não-mapeadas para revisão por IA.
 
 from __future__ import annotations
 
+import functools
+import heapq
 import logging
 import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
 from typing import Any
 
 import pandas as pd
@@ -22,6 +26,11 @@ from backend.classifier.default_mapping import (
 
 logger = logging.getLogger(__name__)
 
+# Classificações padrão já ordenadas no import: get_all_classifications só
+# precisa ordenar (e mesclar) os extras vindos do Sheets.
+_DEFAULT_CLASSIF_SORTED: tuple[str, ...] = tuple(sorted(CLASSIFICATION_TO_DF))
+_DEFAULT_CLASSIF_SET = frozenset(_DEFAULT_CLASSIF_SORTED)
+
 
 class SheetsError(Exception):
     """Erro ao interagir com o Google Sheets."""
@@ -35,9 +44,11 @@ class DEPARAManager:
 
     Args:
         sheets_client: Client autenticado do Google Sheets com métodos
-            ``read_sheet(range) -> list[list]`` e
-            ``append_rows(range, values)`` e
-            ``update_cell(range, value)``.
+            ``read_sheet(range) -> list[list]``,
+            ``append_rows(range, values)``,
+            ``update_cell(range, value)`` e, opcionalmente,
+            ``update_range(range, values)`` (usado para escrever células
+            adjacentes em uma única chamada).
     """
 
     # Colunas esperadas no DEPARA do Sheets
@@ -49,9 +60,31 @@ class DEPARAManager:
         "status",
     ]
 
+    # TTL do cache em memória do DEPARA (segundos).  Edições manuais na
+    # planilha aparecem em até 30s; as escritas via app invalidam na hora.
+    _CACHE_TTL = 30.0
+
+    # Linhas por chamada de append_rows (limite de payload da API)
+    _APPEND_CHUNK = 500
+
     def __init__(self, sheets_client: Any) -> None:
         self._sheets = sheets_client
+        # Lock de ESCRITA apenas (add_new_accounts/update_classification).
+        # Leituras não o adquirem: get_full_depara serve o cache por uma
+        # atribuição atômica de tupla, então N workers leem em paralelo —
+        # o equivalente prático de um readers-writer lock sem dependência.
         self._lock = threading.Lock()
+        # Cache (timestamp, DataFrame) da última leitura do Sheets
+        self._cache: tuple[float, pd.DataFrame] | None = None
+        # Mapa codigo_conta → (classificacao, grupo_df) mantido
+        # incrementalmente pelas escritas — ver _get_depara_map
+        self._depara_map: dict[str, tuple[str, str]] | None = None
+        # Worker único para escritas em background no Sheets (I/O-bound);
+        # o _lock dentro de add_new_accounts serializa com escritas diretas.
+        self._writer = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="depara-writer"
+        )
+        self._pending_writes: list[Future] = []
 
     # ------------------------------------------------------------------
     # Leitura
@@ -67,6 +100,13 @@ class DEPARAManager:
         Raises:
             SheetsError: Se a leitura da planilha falhar.
         """
+        # Várias operações (classificar, listar pendências, atualizar) leem
+        # o DEPARA em sequência — um cache curto evita repetir o round trip
+        # ao Sheets dentro da mesma rajada de chamadas.
+        cached = self._cache
+        if cached is not None and time.monotonic() - cached[0] < self._CACHE_TTL:
+            return cached[1].copy()
+
         try:
             raw = self._sheets.read_sheet("DEPARA!A:E")
         except Exception as exc:
@@ -77,17 +117,49 @@ class DEPARAManager:
             logger.warning("DEPARA vazio ou sem dados no Sheets.")
             return pd.DataFrame(columns=self._DEPARA_COLUMNS)
 
-        header = raw[0]
-        data = raw[1:]
-        df = pd.DataFrame(data, columns=header)
-
-        # Garante que colunas esperadas existem
-        for col in self._DEPARA_COLUMNS:
-            if col not in df.columns:
-                df[col] = ""
+        # Completa linhas curtas até as 5 colunas esperadas numa única
+        # compreensão e monta direto com a lista de colunas conhecida —
+        # sem o passo "conformar ao header lido e depois reindexar".
+        n = len(self._DEPARA_COLUMNS)
+        data = [(r + [""] * n)[:n] for r in raw[1:]]
+        df = pd.DataFrame.from_records(data, columns=self._DEPARA_COLUMNS)
 
         logger.info("DEPARA carregado: %d contas.", len(df))
-        return df[self._DEPARA_COLUMNS]
+
+        # Dictionary-encoding: rótulos curtos e repetidos ("BP", "Auto",
+        # "Pendente"...) viram códigos inteiros — menos memória e máscaras
+        # de igualdade comparando inteiros em vez de strings.
+        for col in ("classificacao", "grupo_df", "status"):
+            df[col] = df[col].astype("category")
+
+        self._cache = (time.monotonic(), df)
+        return df.copy()
+
+    def _get_depara_map(self) -> dict[str, tuple[str, str]]:
+        """Mapa ``codigo_conta`` → ``(classificacao, grupo_df)`` incremental.
+
+        Construído do Sheets apenas no primeiro uso; ``add_new_accounts``
+        e ``update_classification`` atualizam o dict in-place, evitando
+        repetir a leitura A:E a cada ``classify_accounts``.  Extrai as
+        colunas como arrays e monta o dict com um único zip — sem criar
+        uma Series por linha como faria iterrows().
+
+        Raises:
+            SheetsError: Se a leitura inicial da planilha falhar.
+        """
+        if self._depara_map is None:
+            depara_df = self.get_full_depara()
+            codigos = (
+                depara_df["codigo_conta"].astype(str).str.strip().to_numpy()
+            )
+            classifs = depara_df["classificacao"].astype(str).to_numpy()
+            grupos = depara_df["grupo_df"].astype(str).to_numpy()
+            self._depara_map = {
+                c: (k, g)
+                for c, k, g in zip(codigos, classifs, grupos)
+                if c
+            }
+        return self._depara_map
 
     # ------------------------------------------------------------------
     # Classificação
@@ -107,8 +179,9 @@ class DEPARAManager:
                 colunas ``codigo_conta``, ``titulo_conta`` e ``tipo``.
 
         Returns:
-            Cópia do DataFrame com coluna ``classificacao_depara`` e
-            ``grupo_df`` adicionadas.
+            Novo DataFrame com colunas ``classificacao_depara`` e
+            ``grupo_df`` adicionadas (as demais colunas são
+            compartilhadas com o original, sem deep-copy).
 
         Raises:
             ValueError: Se colunas obrigatórias estiverem ausentes.
@@ -120,24 +193,18 @@ class DEPARAManager:
                 f"Colunas obrigatórias ausentes: {', '.join(sorted(missing))}"
             )
 
-        result = df.copy()
-        result["classificacao_depara"] = ""
-        result["grupo_df"] = ""
+        # Apenas as duas colunas novas são alocadas; o DataFrame de saída
+        # sai de df.assign no final, sem deep-copy das colunas do balancete
+        classif_col = pd.Series("", index=df.index, dtype=object)
+        grupo_col = pd.Series("", index=df.index, dtype=object)
 
         # Filtra apenas contas de último nível
-        mask_ultimo = result["tipo"] == "Último Nível"
+        mask_ultimo = df["tipo"] == "Último Nível"
 
-        # Carrega DEPARA existente para lookup
+        # Carrega o mapa do DEPARA (lê o Sheets só na primeira vez; depois
+        # as próprias escritas mantêm o dict atualizado)
         try:
-            depara_df = self.get_full_depara()
-            depara_map: dict[str, tuple[str, str]] = {}
-            for _, row in depara_df.iterrows():
-                codigo = str(row.get("codigo_conta", "")).strip()
-                if codigo:
-                    depara_map[codigo] = (
-                        str(row.get("classificacao", "")),
-                        str(row.get("grupo_df", "")),
-                    )
+            depara_map = self._get_depara_map()
         except SheetsError:
             logger.warning(
                 "Não foi possível carregar DEPARA do Sheets; "
@@ -147,90 +214,91 @@ class DEPARAManager:
 
         new_accounts: list[dict[str, str]] = []
 
-        for idx in result.index[mask_ultimo]:
-            codigo = str(result.at[idx, "codigo_conta"]).strip()
-            titulo = str(result.at[idx, "titulo_conta"]).strip()
+        if mask_ultimo.any():
+            codigo_s = (
+                df.loc[mask_ultimo, "codigo_conta"].astype(str).str.strip()
+            )
+            titulo_s = (
+                df.loc[mask_ultimo, "titulo_conta"].astype(str).str.strip()
+            )
 
-            classificacao = ""
-            grupo_df = ""
+            # Dedup: balancetes repetem códigos entre períodos — classifica
+            # cada código único uma vez e propaga o resultado via map.
+            uniq = (
+                pd.DataFrame({"codigo": codigo_s, "titulo": titulo_s})
+                .drop_duplicates("codigo")
+                .set_index("codigo")
+            )
+            codes = uniq.index.to_series()
 
-            # 1) DEPARA existente
-            if codigo in depara_map:
-                classificacao, grupo_df = depara_map[codigo]
-                if classificacao:
-                    result.at[idx, "classificacao_depara"] = classificacao
-                    result.at[idx, "grupo_df"] = grupo_df
-                    continue
+            # 1) DEPARA existente (classificação vazia não conta como hit)
+            depara_cls = {c: k for c, (k, _) in depara_map.items() if k}
+            depara_grp = {c: g for c, (k, g) in depara_map.items() if k}
+            c1 = codes.map(depara_cls)
 
             # 2) Mapeamento específico por conta exata
-            if codigo in SPECIFIC_ACCOUNT_MAPPING:
-                classificacao = SPECIFIC_ACCOUNT_MAPPING[codigo]
-                grupo_df = CLASSIFICATION_TO_DF.get(classificacao, "")
-                result.at[idx, "classificacao_depara"] = classificacao
-                result.at[idx, "grupo_df"] = grupo_df
-                new_accounts.append(
-                    {
-                        "codigo_conta": codigo,
-                        "titulo_original": titulo,
-                        "classificacao": classificacao,
-                        "grupo_df": grupo_df,
-                        "status": "Auto",
-                    }
-                )
-                continue
-
-            # 3) Mapeamento padrão por prefixo nível 4
-            prefix = self._get_level4_prefix(codigo)
-            if prefix and prefix in DEFAULT_MAPPING:
-                classificacao = DEFAULT_MAPPING[prefix]
-                grupo_df = CLASSIFICATION_TO_DF.get(classificacao, "")
-                result.at[idx, "classificacao_depara"] = classificacao
-                result.at[idx, "grupo_df"] = grupo_df
-                new_accounts.append(
-                    {
-                        "codigo_conta": codigo,
-                        "titulo_original": titulo,
-                        "classificacao": classificacao,
-                        "grupo_df": grupo_df,
-                        "status": "Auto",
-                    }
-                )
-                continue
+            c2 = codes.map(SPECIFIC_ACCOUNT_MAPPING)
+
+            # 3) Mapeamento padrão por prefixo nível 4 (split/join em C)
+            c3 = self._level4_prefix_series(codes).map(DEFAULT_MAPPING)
 
             # 4) Não encontrado → Pendente IA
-            result.at[idx, "classificacao_depara"] = "Pendente IA"
-            result.at[idx, "grupo_df"] = ""
-            new_accounts.append(
-                {
-                    "codigo_conta": codigo,
-                    "titulo_original": titulo,
-                    "classificacao": "Pendente IA",
-                    "grupo_df": "",
-                    "status": "Pendente",
-                }
+            classif_u = c1.combine_first(c2).combine_first(c3).fillna(
+                "Pendente IA"
             )
-            logger.info(
-                "Conta sem mapeamento: %s (%s) → Pendente IA", codigo, titulo
+            grupo_u = (
+                codes.map(depara_grp)
+                .combine_first(classif_u.map(CLASSIFICATION_TO_DF))
+                .fillna("")
             )
 
-        # Persiste novas contas automaticamente
-        if new_accounts:
-            try:
-                self.add_new_accounts(new_accounts)
-            except SheetsError:
-                logger.error(
-                    "Falha ao persistir %d novas contas no Sheets.",
-                    len(new_accounts),
+            classif_col.loc[mask_ultimo] = codigo_s.map(classif_u)
+            grupo_col.loc[mask_ultimo] = codigo_s.map(grupo_u)
+
+            # Contas que não vieram do DEPARA (tiers 2–4) vão para o Sheets,
+            # uma linha por código único
+            new_mask = c1.isna()
+            new_accounts = [
+                {
+                    "codigo_conta": c,
+                    "titulo_original": t,
+                    "classificacao": k,
+                    "grupo_df": g,
+                    "status": "Pendente" if k == "Pendente IA" else "Auto",
+                }
+                for c, t, k, g in zip(
+                    codes[new_mask],
+                    uniq.loc[new_mask, "titulo"],
+                    classif_u[new_mask],
+                    grupo_u[new_mask],
                 )
+            ]
 
-        classified = int(
-            (result.loc[mask_ultimo, "classificacao_depara"] != "Pendente IA")
-            .sum()
-        )
-        pending = int(
-            (result.loc[mask_ultimo, "classificacao_depara"] == "Pendente IA")
-            .sum()
+        # Dictionary-encoding das colunas de rótulos (mantendo "" como
+        # categoria válida para as linhas não-analíticas)
+        classif_col = classif_col.astype("category")
+        if "" not in classif_col.cat.categories:
+            classif_col = classif_col.cat.add_categories([""])
+        grupo_col = grupo_col.astype("category")
+        if "" not in grupo_col.cat.categories:
+            grupo_col = grupo_col.cat.add_categories([""])
+
+        result = df.assign(
+            classificacao_depara=classif_col, grupo_df=grupo_col
         )
+
+        # Persiste novas contas em background: o round trip ao Sheets não
+        # bloqueia o retorno do DataFrame já classificado
+        if new_accounts:
+            self._pending_writes.append(
+                self._writer.submit(self._persist_new_accounts, new_accounts)
+            )
+
+        # Uma passada (value_counts sobre os códigos da categórica) em vez
+        # de duas máscaras booleanas completas
+        vc = classif_col[mask_ultimo].value_counts()
+        pending = int(vc.get("Pendente IA", 0))
+        classified = int(vc.sum() - pending)
         logger.info(
             "Classificação concluída: %d classificadas, %d pendentes.",
             classified,
@@ -243,6 +311,24 @@ class DEPARAManager:
     # Escrita
     # ------------------------------------------------------------------
 
+    def _persist_new_accounts(
+        self, new_accounts: list[dict[str, str]]
+    ) -> None:
+        """Persiste contas novas no worker de escrita, absorvendo falhas."""
+        try:
+            self.add_new_accounts(new_accounts)
+        except SheetsError:
+            logger.error(
+                "Falha ao persistir %d novas contas no Sheets.",
+                len(new_accounts),
+            )
+
+    def flush(self) -> None:
+        """Aguarda a conclusão das escritas pendentes em background."""
+        pending, self._pending_writes = self._pending_writes, []
+        for future in pending:
+            future.result()
+
     def add_new_accounts(self, new_accounts: list[dict[str, str]]) -> None:
         """Adiciona novas contas ao DEPARA no Google Sheets.
 
@@ -268,17 +354,52 @@ class DEPARAManager:
             for acc in new_accounts
         ]
 
+        # Chunks de até _APPEND_CHUNK linhas: respeita o limite de payload
+        # da API e, quando há vários, sobrepõe a latência de rede
+        chunks = [
+            rows[i : i + self._APPEND_CHUNK]
+            for i in range(0, len(rows), self._APPEND_CHUNK)
+        ]
+
         with self._lock:
-            try:
-                self._sheets.append_rows("DEPARA!A:E", rows)
-                logger.info(
-                    "%d novas contas adicionadas ao DEPARA.", len(rows)
+            failures: list[Exception] = []
+
+            def _append(chunk: list[list[str]]) -> None:
+                try:
+                    self._sheets.append_rows("DEPARA!A:E", chunk)
+                except Exception as exc:  # noqa: BLE001 — coletado abaixo
+                    failures.append(exc)
+
+            if len(chunks) == 1:
+                # Caminho comum: uma chamada direta, sem pool
+                _append(chunks[0])
+            else:
+                with ThreadPoolExecutor(max_workers=4) as pool:
+                    list(pool.map(_append, chunks))
+
+            if failures:
+                logger.error(
+                    "Falha ao escrever no Sheets (%d de %d chunks): %s",
+                    len(failures),
+                    len(chunks),
+                    failures[0],
                 )
-            except Exception as exc:
-                logger.error("Falha ao escrever no Sheets: %s", exc)
                 raise SheetsError(
-                    f"Falha ao adicionar contas: {exc}"
-                ) from exc
+                    f"Falha ao adicionar contas: {failures[0]}"
+                ) from failures[0]
+
+            self._cache = None  # invalida o cache de leitura
+            if self._depara_map is not None:
+                for acc in new_accounts:
+                    codigo = str(acc["codigo_conta"]).strip()
+                    if codigo:
+                        self._depara_map[codigo] = (
+                            acc["classificacao"],
+                            acc["grupo_df"],
+                        )
+            logger.info(
+                "%d novas contas adicionadas ao DEPARA.", len(rows)
+            )
 
     def update_classification(
         self, codigo_conta: str, nova_classificacao: str
@@ -300,8 +421,10 @@ class DEPARAManager:
         Raises:
             SheetsError: Se a leitura ou escrita na planilha falhar.
         """
-        new_df_line_needed = nova_classificacao not in CLASSIFICATION_TO_DF
-        grupo_df = CLASSIFICATION_TO_DF.get(nova_classificacao, "")
+        # Um único lookup cobre o teste de existência e o valor
+        grupo_df = CLASSIFICATION_TO_DF.get(nova_classificacao)
+        new_df_line_needed = grupo_df is None
+        grupo_df = grupo_df or ""
 
         with self._lock:
             try:
@@ -326,12 +449,28 @@ class DEPARAManager:
             # Encontra a linha no Sheets (offset +2: header + 1-indexed)
             row_idx = int(depara_df.index[mask][0]) + 2
 
+            # C/D/E são adjacentes: um único update de range custa uma
+            # round trip em vez de três.  Clients antigos sem update_range
+            # caem nas três escritas célula a célula.
+            update_range = getattr(self._sheets, "update_range", None)
             try:
-                self._sheets.update_cell(
-                    f"DEPARA!C{row_idx}", nova_classificacao
-                )
-                self._sheets.update_cell(f"DEPARA!D{row_idx}", grupo_df)
-                self._sheets.update_cell(f"DEPARA!E{row_idx}", "Revisado")
+                if update_range is not None:
+                    update_range(
+                        f"DEPARA!C{row_idx}:E{row_idx}",
+                        [[nova_classificacao, grupo_df, "Revisado"]],
+                    )
+                else:
+                    self._sheets.update_cell(
+                        f"DEPARA!C{row_idx}", nova_classificacao
+                    )
+                    self._sheets.update_cell(f"DEPARA!D{row_idx}", grupo_df)
+                    self._sheets.update_cell(f"DEPARA!E{row_idx}", "Revisado")
+                self._cache = None  # invalida o cache de leitura
+                if self._depara_map is not None:
+                    self._depara_map[str(codigo_conta).strip()] = (
+                        nova_classificacao,
+                        grupo_df,
+                    )
             except Exception as exc:
                 logger.error(
                     "Falha ao atualizar conta %s no Sheets: %s",
@@ -356,6 +495,69 @@ class DEPARAManager:
             "grupo_df": grupo_df,
         }
 
+    def build_classification_update(
+        self, codigo_conta: str, nova_classificacao: str
+    ) -> tuple[dict[str, Any] | None, dict[str, Any]]:
+        """Monta a atualização de classificação sem escrever no Sheets.
+
+        Variante de :meth:`update_classification` para uso com
+        ``batch_update_values``: devolve o range/valores prontos para o
+        chamador agrupar com outras escritas numa única round trip.
+
+        Returns:
+            Tupla ``(update, result)`` onde ``update`` é o dict
+            ``{"range": ..., "values": ...}`` (ou ``None`` se a conta
+            não existe no DEPARA) e ``result`` tem o mesmo formato do
+            retorno de :meth:`update_classification`.
+        """
+        grupo_df = CLASSIFICATION_TO_DF.get(nova_classificacao)
+        new_df_line_needed = grupo_df is None
+        grupo_df = grupo_df or ""
+
+        result = {
+            "propagated": False,
+            "new_df_line_needed": new_df_line_needed,
+            "classification": nova_classificacao,
+            "grupo_df": grupo_df,
+        }
+
+        with self._lock:
+            depara_df = self.get_full_depara()
+            mask = depara_df["codigo_conta"] == codigo_conta
+
+            if not mask.any():
+                logger.warning(
+                    "Conta %s não encontrada no DEPARA para atualização.",
+                    codigo_conta,
+                )
+                return None, result
+
+            # Encontra a linha no Sheets (offset +2: header + 1-indexed)
+            row_idx = int(depara_df.index[mask][0]) + 2
+
+        update = {
+            "range": f"DEPARA!C{row_idx}:E{row_idx}",
+            "values": [[nova_classificacao, grupo_df, "Revisado"]],
+        }
+        result["propagated"] = True
+        return update, result
+
+    def apply_local_update(
+        self, codigo_conta: str, classificacao: str, grupo_df: str
+    ) -> None:
+        """Sincroniza os caches locais após uma escrita externa bem-sucedida.
+
+        Deve ser chamado depois que o update montado por
+        :meth:`build_classification_update` foi efetivado via batch.
+        """
+        with self._lock:
+            self._cache = None
+            if self._depara_map is not None:
+                self._depara_map[str(codigo_conta).strip()] = (
+                    classificacao,
+                    grupo_df,
+                )
+
     # ------------------------------------------------------------------
     # Consultas
     # ------------------------------------------------------------------
@@ -373,7 +575,13 @@ class DEPARAManager:
         """
         depara_df = self.get_full_depara()
         pending = depara_df[depara_df["status"] == "Pendente"]
-        records: list[dict[str, str]] = pending.to_dict(orient="records")
+        # zip de colunas: monta os dicts a partir dos arrays das 5 colunas
+        # conhecidas, sem o caminho genérico linha a linha do to_dict
+        cols = self._DEPARA_COLUMNS
+        arrs = [pending[c].to_numpy() for c in cols]
+        records: list[dict[str, str]] = [
+            dict(zip(cols, vals)) for vals in zip(*arrs)
+        ]
         logger.info("%d contas pendentes de revisão.", len(records))
         return records
 
@@ -386,31 +594,49 @@ class DEPARAManager:
         Returns:
             Lista ordenada de strings de classificação.
         """
-        classifications = set(CLASSIFICATION_TO_DF.keys())
-
+        extras: set[str] = set()
         try:
             depara_df = self.get_full_depara()
             sheets_classif = (
                 depara_df["classificacao"].dropna().unique().tolist()
             )
-            classifications.update(
-                c for c in sheets_classif if c and c != "Pendente IA"
-            )
+            extras = {
+                c
+                for c in sheets_classif
+                if c
+                and c != "Pendente IA"
+                and c not in _DEFAULT_CLASSIF_SET
+            }
         except SheetsError:
             logger.warning(
                 "Falha ao ler classificações do Sheets; "
                 "retornando apenas as padrão."
             )
 
-        return sorted(classifications)
+        if not extras:
+            return list(_DEFAULT_CLASSIF_SORTED)
+        # As padrão já estão ordenadas: basta ordenar os extras e mesclar
+        return list(heapq.merge(_DEFAULT_CLASSIF_SORTED, sorted(extras)))
 
     # ------------------------------------------------------------------
     # Helpers
     # ------------------------------------------------------------------
 
     @staticmethod
+    def _level4_prefix_series(codigos: pd.Series) -> pd.Series:
+        """Versão vetorizada de ``_get_level4_prefix`` para uma Series.
+
+        Um único split/join em C sobre toda a coluna, em vez de N
+        chamadas Python ao helper escalar.
+        """
+        parts = codigos.str.split(".")
+        pref4 = parts.str[:4].str.join(".")
+        return pref4.where(parts.str.len() >= 4, codigos)
+
+    @staticmethod
+    @functools.lru_cache(maxsize=8192)
     def _get_level4_prefix(codigo: str) -> str:
-        """Extrai o prefixo de nível 4 do código da conta.
+        """Extrai o prefixo de nível 4 do código da conta (memoizado).
 
         Para contas com 5 partes (ex: ``"1.01.01.02.00004"``), retorna
         as 4 primeiras (``"1.01.01.02"``).  Para contas com exatamente
@@ -426,8 +652,16 @@ class DEPARAManager:
         """
         if not codigo:
             return ""
-        parts = codigo.split(".")
-        if len(parts) >= 4:
-            return ".".join(parts[:4])
-        # Contas com menos partes (ex: 4.98.03) → tenta lookup direto
-        return codigo
+        # count/rfind são duas varreduras em C sobre uma string curta —
+        # sem a lista intermediária e o join do split
+        n = codigo.count(".")
+        if n <= 3:
+            # Contas com 4 partes ou menos (ex: 4.98.03) → lookup direto
+            return codigo
+        if n == 4:
+            return codigo[: codigo.rfind(".")]
+        # Códigos mais profundos que 5 partes (raros): corta no 4º ponto
+        i = -1
+        for _ in range(4):
+            i = codigo.find(".", i + 1)
+        return codigo[:i]
@@ -13,6 +13,8 @@ from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
 
+from backend.classifier import ai_classifier
+from backend.classifier import cache as disk_cache
 from backend.classifier.ai_classifier import (
     _build_user_prompt,
     _infer_grupo_df,
@@ -22,26 +24,43 @@ from backend.classifier.ai_classifier import (
 )
 
 
+@pytest.fixture(autouse=True)
+def _limpa_memo(tmp_path, monkeypatch):
+    """Isola cada teste dos caches (memória + disco) e do client compartilhado."""
+    monkeypatch.setenv("AF_RELATORIO_CACHE_DIR", str(tmp_path))
+    disk_cache.reset()
+    ai_classifier.clear_memo()
+    ai_classifier._get_client.cache_clear()
+    yield
+    disk_cache.reset()
+    ai_classifier.clear_memo()
+    ai_classifier._get_client.cache_clear()
+
+
 # ============================================================================
 # Fixtures: contas de teste
 # ============================================================================
 
 
 def _sample_accounts() -> list[dict[str, str]]:
-    """Contas fictícias para classificação."""
+    """Contas fictícias para classificação.
+
+    Os níveis 4 não existem em DEFAULT_MAPPING de propósito: estas contas
+    devem atravessar o pré-filtro determinístico e chegar ao Gemini.
+    """
     return [
         {
             "codigo_conta": "4.01.01.04.00099",
             "titulo_conta": "DESPESAS COM VIAGENS",
             "grupo": "DESPESA",
-            "grupo_nivel4": "4.01.01.04",
+            "grupo_nivel4": "4.99.99.99",
             "titulo_nivel4": "DESPESAS ADMINISTRATIVAS",
         },
         {
             "codigo_conta": "1.01.03.08.00055",
             "titulo_conta": "CREDITOS DIVERSOS",
             "grupo": "ATIVO",
-            "grupo_nivel4": "1.01.03.08",
+            "grupo_nivel4": "1.99.99.99",
             "titulo_nivel4": "CREDITOS A RECUPERAR",
         },
     ]
@@ -283,6 +302,44 @@ class TestClassifyNewAccounts:
             assert r["classificacao_sugerida"] == "Não Classificada"
             assert "API Error" in r["justificativa"]
 
+    def test_mapped_accounts_skip_gemini(self) -> None:
+        """Contas resolvíveis pelos mapeamentos fixos nunca chamam a API."""
+        accounts = [
+            {
+                "codigo_conta": "4.01.01.04.00001",
+                "titulo_conta": "DESPESAS DE ESCRITORIO",
+                "grupo": "DESPESA",
+                "grupo_nivel4": "4.01.01.04",
+                "titulo_nivel4": "DESPESAS ADMINISTRATIVAS",
+            },
+            {
+                "codigo_conta": "3.01.01.02.00004",
+                "titulo_conta": "PIS SOBRE FATURAMENTO",
+                "grupo": "RECEITA",
+                "grupo_nivel4": "3.01.01.02",
+                "titulo_nivel4": "DEDUCOES",
+            },
+        ]
+
+        mock_client = MagicMock()
+        mock_aio_models = AsyncMock()
+        mock_client.aio.models = mock_aio_models
+
+        with patch.dict("os.environ", {"GEMINI_API_KEY": "test-key"}):
+            with patch("backend.classifier.ai_classifier.genai") as mock_genai:
+                mock_genai.Client.return_value = mock_client
+                results = asyncio.run(
+                    classify_new_accounts(accounts, _sample_classifications())
+                )
+
+        mock_aio_models.generate_content.assert_not_called()
+        assert results[0]["classificacao_sugerida"] == (
+            "(-) Despesas Gerais e Administrativas"
+        )
+        assert results[1]["classificacao_sugerida"] == "(-) PIS"
+        assert all(r["confianca"] == "alta" for r in results)
+        assert all(r["grupo_df"] == "DRE" for r in results)
+
     def test_batching_splits_large_input(self) -> None:
         """Mais de 20 contas gera múltiplos batches."""
         # Cria 25 contas
@@ -291,7 +348,7 @@ class TestClassifyNewAccounts:
                 "codigo_conta": f"4.01.01.04.{i:05d}",
                 "titulo_conta": f"CONTA {i}",
                 "grupo": "DESPESA",
-                "grupo_nivel4": "4.01.01.04",
+                "grupo_nivel4": "4.99.99.99",
                 "titulo_nivel4": "DESPESAS ADMINISTRATIVAS",
             }
             for i in range(25)
@@ -325,6 +382,124 @@ class TestClassifyNewAccounts:
         assert len(results) == 25
         assert mock_aio_models.generate_content.call_count == 2
 
+    def test_out_of_order_response_matches_by_codigo(self) -> None:
+        """Resposta fora de ordem é casada pelo codigo_conta, não por posição."""
+        accounts = _sample_accounts()
+        # Itens na ordem inversa à das contas enviadas
+        reversed_json = json.dumps(
+            json.loads(_gemini_response_json(accounts))[::-1],
+            ensure_ascii=False,
+        )
+
+        mock_response = MagicMock()
+        mock_response.text = reversed_json
+
+        mock_client = MagicMock()
+        mock_aio_models = AsyncMock()
+        mock_aio_models.generate_content.return_value = mock_response
+        mock_client.aio.models = mock_aio_models
+
+        with patch.dict("os.environ", {"GEMINI_API_KEY": "test-key"}):
+            with patch("backend.classifier.ai_classifier.genai") as mock_genai:
+                mock_genai.Client.return_value = mock_client
+                results = asyncio.run(
+                    classify_new_accounts(accounts, _sample_classifications())
+                )
+
+        assert len(results) == 2
+        # Cada conta recebe o SEU resultado (classificação distinta por grupo)
+        assert results[0]["codigo_conta"] == "4.01.01.04.00099"
+        assert results[0]["classificacao_sugerida"] == (
+            "(-) Despesas Gerais e Administrativas"
+        )
+        assert results[1]["codigo_conta"] == "1.01.03.08.00055"
+        assert results[1]["classificacao_sugerida"] == "(+) Outros Créditos"
+
+    def test_missing_item_in_response_yields_error_result(self) -> None:
+        """Conta sem item na resposta vira resultado de erro, sem cache."""
+        accounts = _sample_accounts()
+        # Resposta só com a primeira conta
+        short_json = json.dumps(
+            json.loads(_gemini_response_json(accounts))[:1],
+            ensure_ascii=False,
+        )
+
+        mock_response = MagicMock()
+        mock_response.text = short_json
+
+        mock_client = MagicMock()
+        mock_aio_models = AsyncMock()
+        mock_aio_models.generate_content.return_value = mock_response
+        mock_client.aio.models = mock_aio_models
+
+        with patch.dict("os.environ", {"GEMINI_API_KEY": "test-key"}):
+            with patch("backend.classifier.ai_classifier.genai") as mock_genai:
+                mock_genai.Client.return_value = mock_client
+                results = asyncio.run(
+                    classify_new_accounts(accounts, _sample_classifications())
+                )
+
+        assert len(results) == 2
+        assert results[0]["classificacao_sugerida"] != "Não Classificada"
+        assert results[1]["classificacao_sugerida"] == "Não Classificada"
+        assert "resposta sem item" in results[1]["justificativa"]
+        # O erro não pode ter sido persistido sob a chave da conta
+        classif_key = tuple(sorted(set(_sample_classifications())))
+        disk_key = disk_cache.make_key(accounts[1], classif_key)
+        assert disk_cache.get(disk_key) is None
+
+    def test_memo_eviction_does_not_drop_results(self, monkeypatch) -> None:
+        """Eviction do memo cheio nunca engole contas da chamada corrente."""
+        # Memo no limite ao entrar: a eviction precisa acontecer antes de
+        # registrar os hits desta invocação, senão contas resolvidas pelo
+        # pré-filtro/disco sumiriam da resposta.
+        monkeypatch.setattr(ai_classifier, "_MEMO_MAXSIZE", 2)
+        ai_classifier._memo[("velha", "A", "", ())] = {"justificativa": ""}
+        ai_classifier._memo[("velha", "B", "", ())] = {"justificativa": ""}
+
+        gemini_accounts = _sample_accounts()
+        mapped_accounts = [
+            {
+                "codigo_conta": "4.01.01.04.00001",
+                "titulo_conta": "DESPESAS DE ESCRITORIO",
+                "grupo": "DESPESA",
+                "grupo_nivel4": "4.01.01.04",
+                "titulo_nivel4": "DESPESAS ADMINISTRATIVAS",
+            },
+            {
+                "codigo_conta": "3.01.01.02.00004",
+                "titulo_conta": "PIS SOBRE FATURAMENTO",
+                "grupo": "RECEITA",
+                "grupo_nivel4": "3.01.01.02",
+                "titulo_nivel4": "DEDUCOES",
+            },
+        ]
+        accounts = mapped_accounts + gemini_accounts
+
+        mock_response = MagicMock()
+        mock_response.text = _gemini_response_json(gemini_accounts)
+
+        mock_client = MagicMock()
+        mock_aio_models = AsyncMock()
+        mock_aio_models.generate_content.return_value = mock_response
+        mock_client.aio.models = mock_aio_models
+
+        with patch.dict("os.environ", {"GEMINI_API_KEY": "test-key"}):
+            with patch("backend.classifier.ai_classifier.genai") as mock_genai:
+                mock_genai.Client.return_value = mock_client
+                results = asyncio.run(
+                    classify_new_accounts(accounts, _sample_classifications())
+                )
+
+        # Toda conta de entrada aparece na saída, na ordem de entrada
+        assert len(results) == 4
+        assert [r["codigo_conta"] for r in results] == [
+            a["codigo_conta"] for a in accounts
+        ]
+        assert all(
+            r["classificacao_sugerida"] != "Não Classificada" for r in results
+        )
+
     def test_empty_response_triggers_retry(self) -> None:
         """Resposta vazia do Gemini aciona retry."""
         accounts = [_sample_accounts()[0]]
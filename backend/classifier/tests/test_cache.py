@@ -0,0 +1,86 @@
+"""
+Testes do cache persistente de classificações da IA.
+
+Usa um diretório temporário via AF_RELATORIO_CACHE_DIR — nenhum teste
+toca o cache real do usuário.
+"""
+
+from __future__ import annotations
+
+import time
+
+import pytest
+
+from backend.classifier import cache
+
+
+@pytest.fixture(autouse=True)
+def _cache_isolado(tmp_path, monkeypatch):
+    """Aponta o cache para um diretório temporário."""
+    monkeypatch.setenv("AF_RELATORIO_CACHE_DIR", str(tmp_path))
+    cache.reset()
+    yield
+    cache.reset()
+
+
+def _sample_result() -> dict:
+    return {
+        "codigo_conta": "4.01.01.04.00099",
+        "classificacao_sugerida": "(-) Despesas Gerais e Administrativas",
+        "confianca": "alta",
+        "justificativa": "Teste",
+        "grupo_df": "DRE",
+        "is_new_classification": False,
+    }
+
+
+class TestDiskCache:
+    """Testes de roundtrip e expiração do cache em disco."""
+
+    def test_roundtrip(self) -> None:
+        """put seguido de get devolve o mesmo resultado."""
+        key = cache.make_key({"codigo_conta": "4.01.01.04.00099"}, ())
+        cache.put(key, _sample_result())
+
+        assert cache.get(key) == _sample_result()
+
+    def test_miss_returns_none(self) -> None:
+        """Chave inexistente retorna None."""
+        assert cache.get("v1:inexistente") is None
+
+    def test_expired_entry_returns_none(self, monkeypatch) -> None:
+        """Entradas mais antigas que o TTL são ignoradas."""
+        key = cache.make_key({"codigo_conta": "1.01.01.02.00001"}, ())
+        cache.put(key, _sample_result())
+
+        monkeypatch.setattr(
+            cache, "time", _FakeTime(time.time() + cache._TTL_SECONDS + 1)
+        )
+        assert cache.get(key) is None
+
+    def test_key_ignores_classification_order(self) -> None:
+        """A mesma lista de classificações em ordens diferentes gera a mesma chave."""
+        acc = {"codigo_conta": "4.01.01.04.00099"}
+        key_a = cache.make_key(acc, ("(+) A", "(-) B"))
+        key_b = cache.make_key(acc, ("(-) B", "(+) A"))
+
+        assert key_a == key_b
+
+    def test_persists_across_reset(self) -> None:
+        """Entradas sobrevivem ao fechamento/reabertura da conexão."""
+        key = cache.make_key({"codigo_conta": "2.01.01.01.00003"}, ())
+        cache.put(key, _sample_result())
+
+        cache.reset()
+
+        assert cache.get(key) == _sample_result()
+
+
+class _FakeTime:
+    """Substituto mínimo do módulo time com relógio fixo."""
+
+    def __init__(self, now: float) -> None:
+        self._now = now
+
+    def time(self) -> float:
+        return self._now
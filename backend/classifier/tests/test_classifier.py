@@ -15,6 +15,9 @@ from backend.classifier.default_mapping import (
     CLASSIFICATION_TO_DF,
     DEFAULT_MAPPING,
     SPECIFIC_ACCOUNT_MAPPING,
+    _classify_by_trie,
+    classify_by_prefix,
+    resolve,
 )
 from backend.classifier.depara_manager import DEPARAManager, SheetsError
 
@@ -42,6 +45,23 @@ def _make_mock_sheets(
     return client
 
 
+class _FailingSheets:
+    """Fake leve de sheets_client em que toda operação falha.
+
+    Mais barato que um MagicMock (sem autospec de atributos nem registro
+    de chamadas) para os testes de caminho de falha.
+    """
+
+    def read_sheet(self, *args, **kwargs):
+        raise Exception("Connection error")
+
+    def append_rows(self, *args, **kwargs):
+        raise Exception("Connection error")
+
+    def update_cell(self, *args, **kwargs):
+        raise Exception("Connection error")
+
+
 def _make_balancete_df(
     contas: list[dict[str, str]],
 ) -> pd.DataFrame:
@@ -120,6 +140,87 @@ class TestDefaultMapping:
             )
 
 
+# ============================================================================
+# Testes de resolve / classify_by_prefix
+# ============================================================================
+
+
+class TestResolve:
+    """Testes da API pública de resolução por mapeamentos fixos."""
+
+    def test_specific_beats_default(self) -> None:
+        """SPECIFIC_ACCOUNT_MAPPING tem prioridade sobre DEFAULT_MAPPING."""
+        # "3.01.01.02" existe em DEFAULT, mas a conta exata é refinada
+        assert resolve("3.01.01.02.00004") == "(-) PIS"
+        assert DEFAULT_MAPPING["3.01.01.02"] == "(-) Deduções da Receita"
+
+    def test_falls_back_to_level4_prefix(self) -> None:
+        """Conta analítica sem refinamento usa o prefixo nível 4."""
+        assert resolve("4.01.01.04.00099") == (
+            "(-) Despesas Gerais e Administrativas"
+        )
+
+    def test_falls_back_to_level3_prefix(self) -> None:
+        """Chaves de 3 segmentos (impostos) também casam."""
+        assert resolve("4.98.03.01.00001") == "(-) CSLL"
+
+    def test_unmapped_returns_none(self) -> None:
+        """Código sem mapeamento retorna None."""
+        assert resolve("9.99.99.99.99999") is None
+
+    def test_unpadded_code_does_not_alias(self) -> None:
+        """Sem zero-padding o código NÃO casa com a chave padded."""
+        # "1.1.1.2" empacotaria igual a "1.01.01.02" — deve cair na trie
+        # (que não conhece "1.1.1.2") e retornar None, não a classificação
+        # da conta padded.
+        assert resolve("1.1.1.2") is None
+        assert resolve("1.01.01.02") == "(+) Caixa e Equivalentes de Caixa"
+
+    def test_parity_with_trie(self) -> None:
+        """Caminho empacotado e trie concordam para todas as chaves."""
+        resolve.cache_clear()
+        codes = list(DEFAULT_MAPPING) + list(SPECIFIC_ACCOUNT_MAPPING) + [
+            "4.01.01.04.00099",
+            "1.01.03.08.00055",
+            "9.99.99.99.99999",
+            "foo.bar",
+        ]
+        for code in codes:
+            assert resolve(code) == _classify_by_trie(code), code
+
+
+class TestClassifyByPrefix:
+    """Testes do casamento de prefixo restrito a DEFAULT_MAPPING."""
+
+    def test_matches_all_default_keys(self) -> None:
+        """Toda chave de DEFAULT_MAPPING casa consigo mesma."""
+        for code, cls in DEFAULT_MAPPING.items():
+            assert classify_by_prefix(code) == cls
+
+    def test_ignores_specific_mapping(self) -> None:
+        """Refinamentos por conta exata não participam do prefixo."""
+        assert classify_by_prefix("3.01.01.02.00004") == (
+            "(-) Deduções da Receita"
+        )
+
+    def test_longest_prefix_wins(self) -> None:
+        """Prefixo mais longo tem prioridade sobre o mais curto."""
+        # Equivalente ao brute force do mais longo para o mais curto
+        def _brute(codigo: str) -> str | None:
+            for length in sorted({len(k) for k in DEFAULT_MAPPING}, reverse=True):
+                cls = DEFAULT_MAPPING.get(codigo[:length])
+                if cls is not None:
+                    return cls
+            return None
+
+        for code in ("4.98.03.01.00001", "1.01.01.02.00004", "9.99"):
+            assert classify_by_prefix(code) == _brute(code), code
+
+    def test_unmapped_returns_none(self) -> None:
+        """Código fora do mapeamento retorna None."""
+        assert classify_by_prefix("8.01.01.01.00001") is None
+
+
 # ============================================================================
 # Testes de DEPARAManager.classify_accounts
 # ============================================================================
@@ -237,6 +338,7 @@ class TestClassifyAccounts:
         )
 
         manager.classify_accounts(df)
+        manager.flush()  # escrita acontece em background
 
         sheets.append_rows.assert_called_once()
         args = sheets.append_rows.call_args
@@ -259,9 +361,7 @@ class TestClassifyAccounts:
 
     def test_sheets_read_failure_uses_defaults(self) -> None:
         """Falha na leitura do Sheets não impede classificação."""
-        sheets = MagicMock()
-        sheets.read_sheet.side_effect = Exception("Connection error")
-        sheets.append_rows.side_effect = Exception("Connection error")
+        sheets = _FailingSheets()
         manager = DEPARAManager(sheets)
         df = _make_balancete_df(
             [{"codigo": "1.01.01.02.00004", "titulo": "BANCO"}]
@@ -368,12 +468,26 @@ class TestUpdateClassification:
         assert result["new_df_line_needed"] is True
         assert result["grupo_df"] == ""
 
+    def test_update_writes_single_range(self) -> None:
+        """Atualização escreve C:E em uma única chamada de range."""
+        sheets = _make_mock_sheets(
+            [["1.01.01.02.00004", "BANCO", "(+) Caixa", "BP", "Auto"]]
+        )
+        manager = DEPARAManager(sheets)
+
+        manager.update_classification("1.01.01.02.00004", "(-) Equipe")
+
+        sheets.update_range.assert_called_once_with(
+            "DEPARA!C2:E2", [["(-) Equipe", "DRE", "Revisado"]]
+        )
+        sheets.update_cell.assert_not_called()
+
     def test_update_sheets_failure_raises(self) -> None:
         """Falha no Sheets durante update levanta SheetsError."""
         sheets = _make_mock_sheets(
             [["1.01.01.02.00004", "BANCO", "(+) Caixa", "BP", "Auto"]]
         )
-        sheets.update_cell.side_effect = Exception("API Error")
+        sheets.update_range.side_effect = Exception("API Error")
         manager = DEPARAManager(sheets)
 
         with pytest.raises(SheetsError, match="Falha ao atualizar"):
@@ -466,8 +580,7 @@ class TestGetAllClassifications:
 
     def test_sheets_failure_returns_defaults(self) -> None:
         """Falha no Sheets retorna apenas classificações padrão."""
-        sheets = MagicMock()
-        sheets.read_sheet.side_effect = Exception("Connection error")
+        sheets = _FailingSheets()
         manager = DEPARAManager(sheets)
 
         result = manager.get_all_classifications()
@@ -6,15 +6,25 @@ Inclui autenticação via cookie httponly, CORS, e monta todos os routers.
 
 from __future__ import annotations
 
+import hmac
 import logging
 import time
 
 from contextlib import asynccontextmanager
+from functools import lru_cache
 
 from fastapi import FastAPI, Request, Response, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, ORJSONResponse
 from jose import jwt, JWTError
 
+try:  # serialização de respostas ~5× mais rápida quando disponível
+    import orjson  # noqa: F401
+
+    _DEFAULT_RESPONSE_CLASS = ORJSONResponse
+except ImportError:  # pragma: no cover - fallback stdlib
+    _DEFAULT_RESPONSE_CLASS = JSONResponse
+
 from backend.config import get_settings
 from backend.sheets.sheets_client import SheetsClient
 
@@ -37,6 +47,10 @@ _JWT_ALGORITHM = "HS256"
 _TOKEN_EXPIRE_SECONDS = 60 * 60 * 24  # 24 horas
 _COOKIE_NAME = "af_session"
 
+# Corpos 401 pré-serializados: o caminho de rejeição vira um memcpy
+_UNAUTH_BODY = '{"detail":"Não autenticado"}'.encode()
+_INVALID_BODY = '{"detail":"Token inválido ou expirado"}'.encode()
+
 # ---------------------------------------------------------------------------
 # Lifespan — inicializa SheetsClient uma vez
 # ---------------------------------------------------------------------------
@@ -57,6 +71,8 @@ async def lifespan(application: FastAPI):
         logger.error("Falha ao inicializar SheetsClient: %s", exc)
         application.state.sheets_client = None
     yield
+    # Tokens decodificados não sobrevivem a um restart do processo
+    _cached_decode.cache_clear()
 
 
 # ---------------------------------------------------------------------------
@@ -67,22 +83,28 @@ app = FastAPI(
     description="API de automação financeira: upload de balancetes, DRE, BP, DFC.",
     version="1.0.0",
     lifespan=lifespan,
+    default_response_class=_DEFAULT_RESPONSE_CLASS,
 )
 
 # ---------------------------------------------------------------------------
 # CORS
 # ---------------------------------------------------------------------------
 settings = get_settings()
-_origins = [settings.frontend_url]
+# Snapshot dos campos quentes no import: settings são imutáveis em runtime
+# (reload exige restart do processo, que já é o modelo de deploy)
+_APP_PASSWORD_BYTES = settings.app_password.encode()
+_origins = {settings.frontend_url}
 if "localhost" not in settings.frontend_url:
-    _origins.append("http://localhost:3000")
+    _origins.add("http://localhost:3000")
 
+# Métodos/headers explícitos: o middleware responde preflights com as
+# listas prontas, sem o desvio de expansão do "*" a cada request
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=_origins,
+    allow_origins=sorted(_origins),
     allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
+    allow_methods=["GET", "POST", "PUT", "DELETE", "OPTIONS"],
+    allow_headers=["Content-Type", "Authorization", "Cookie"],
 )
 
 
@@ -92,10 +114,15 @@ app.add_middleware(
 
 
 @app.post("/api/login")
-async def login(body: dict, response: Response):
+async def login(body: dict):
     """Autentica com senha e retorna cookie httponly."""
     password = body.get("password", "")
-    if password != get_settings().app_password:
+    # body é um dict sem validação: "password" pode chegar como número ou
+    # null — qualquer tipo errado é 401, nunca um 500 no .encode()
+    if not isinstance(password, str):
+        raise HTTPException(status_code=401, detail="Senha incorreta")
+    # compare_digest: comparação em tempo constante, sem early exit
+    if not hmac.compare_digest(password.encode(), _APP_PASSWORD_BYTES):
         raise HTTPException(status_code=401, detail="Senha incorreta")
 
     expires = int(time.time()) + _TOKEN_EXPIRE_SECONDS
@@ -105,7 +132,8 @@ async def login(body: dict, response: Response):
         algorithm=_JWT_ALGORITHM,
     )
 
-    response.set_cookie(
+    resp = _DEFAULT_RESPONSE_CLASS({"token": "ok", "expires": expires})
+    resp.set_cookie(
         key=_COOKIE_NAME,
         value=token,
         httponly=True,
@@ -113,8 +141,7 @@ async def login(body: dict, response: Response):
         samesite="lax",
         secure=False,  # True em produção com HTTPS
     )
-
-    return {"token": "ok", "expires": expires}
+    return resp
 
 
 # ---------------------------------------------------------------------------
@@ -122,6 +149,23 @@ async def login(body: dict, response: Response):
 # ---------------------------------------------------------------------------
 
 
+@lru_cache(maxsize=2048)
+def _cached_decode(token: str) -> int:
+    """Verifica a assinatura do token uma única vez e retorna o claim exp.
+
+    O mesmo cookie de sessão chega em milhares de requests: o HMAC +
+    parse JSON rodam só na primeira; depois a validação vira um lookup
+    no cache e uma comparação de expiração com ``time.time()``.
+    """
+    claims = jwt.decode(
+        token,
+        _JWT_SECRET,
+        algorithms=[_JWT_ALGORITHM],
+        options={"verify_exp": False},
+    )
+    return int(claims["exp"])
+
+
 @app.middleware("http")
 async def auth_middleware(request: Request, call_next):
     """Verifica cookie de sessão em todas as rotas /api/* exceto /api/login."""
@@ -135,16 +179,18 @@ async def auth_middleware(request: Request, call_next):
     token = request.cookies.get(_COOKIE_NAME)
     if not token:
         return Response(
-            content='{"detail":"Não autenticado"}',
+            content=_UNAUTH_BODY,
             status_code=401,
             media_type="application/json",
         )
 
     try:
-        jwt.decode(token, _JWT_SECRET, algorithms=[_JWT_ALGORITHM])
-    except JWTError:
+        exp = _cached_decode(token)
+    except (JWTError, KeyError, ValueError):
+        exp = 0  # assinatura/claims inválidos → trata como expirado
+    if exp < time.time():
         return Response(
-            content='{"detail":"Token inválido ou expirado"}',
+            content=_INVALID_BODY,
             status_code=401,
             media_type="application/json",
         )
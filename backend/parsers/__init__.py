@@ -3,18 +3,27 @@ Pacote de parsers para balancetes contábeis exportados do sistema Hinova.
 
 Exporta as funções principais:
 - parse_brazilian_value: converte valores no formato brasileiro para float
+- parse_brazilian_series: versão vetorizada para colunas pandas
 - apply_sign: aplica sinal conforme grupo contábil
+- apply_sign_series: versão vetorizada do apply_sign
 - extract_header: extrai metadados do cabeçalho do balancete
 - parse_balancete: parser completo que retorna (header_dict, DataFrame)
 """
 
-from backend.parsers.value_converter import parse_brazilian_value, apply_sign
+from backend.parsers.value_converter import (
+    parse_brazilian_value,
+    parse_brazilian_series,
+    apply_sign,
+    apply_sign_series,
+)
 from backend.parsers.header_extractor import extract_header
 from backend.parsers.balancete_parser import parse_balancete
 
 __all__ = [
     "parse_brazilian_value",
+    "parse_brazilian_series",
     "apply_sign",
+    "apply_sign_series",
     "extract_header",
     "parse_balancete",
 ]
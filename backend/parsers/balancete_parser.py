@@ -9,34 +9,56 @@ níveis, grupos e saldos com sinais aplicados.
 from __future__ import annotations
 
 import os
-from typing import Any
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from itertools import islice
+from typing import Any, Iterator
 
+import numpy as np
 import pandas as pd
 
-from backend.parsers.header_extractor import extract_header
-from backend.parsers.value_converter import apply_sign, parse_brazilian_value
+from backend.parsers.header_extractor import extract_header_from_rows
+from backend.parsers.value_converter import apply_sign_series, parse_brazilian_series
 
+try:  # leitor Rust (Calamine): linhas como listas Python, sem objetos
+    # de célula — ordens de grandeza mais rápido que openpyxl/xlrd
+    from python_calamine import CalamineWorkbook
+except ImportError:  # fallback para os leitores puros-Python
+    CalamineWorkbook = None
 
-# Mapa do primeiro dígito da conta para grupo contábil
-_GROUP_MAP: dict[str, tuple[str, int]] = {
-    "1": ("ATIVO", 1),
-    "2": ("PASSIVO", 2),
-    "3": ("RECEITA", 3),
-    "4": ("DESPESA", 4),
-    "5": ("DESPESA", 4),  # Grupo 5 também é despesa/custos em alguns planos
-}
 
+# Tabela do primeiro dígito da conta para grupo contábil, indexada por
+# int(codigo[0]) — subscrito inteiro em vez de hash + igualdade do dict.
+# Grupo 5 também é despesa/custos em alguns planos.
+_GROUP_TABLE: tuple[tuple[str, int] | None, ...] = (
+    None,
+    ("ATIVO", 1),
+    ("PASSIVO", 2),
+    ("RECEITA", 3),
+    ("DESPESA", 4),
+    ("DESPESA", 4),
+)
 
-def _read_data_rows(filepath: str) -> list[list[Any]]:
-    """Lê todas as linhas de dados do balancete (a partir da linha 3).
+# Espelhos da tabela em arrays numpy para o caminho vetorizado: o dígito
+# inicial vira índice direto (fancy indexing), sem map() por linha
+_GRUPO_NOMES = np.array(
+    ["", "ATIVO", "PASSIVO", "RECEITA", "DESPESA", "DESPESA", "", "", "", ""]
+)
+_GRUPO_NUMS = np.array([0, 1, 2, 3, 4, 4, 0, 0, 0, 0], dtype=np.int8)
+
+
+def _read_all_rows(filepath: str) -> list[list[Any]]:
+    """Abre o arquivo UMA vez e lê todas as linhas (cabeçalho + dados).
 
-    Lê até encontrar uma linha com "Total Geral" na coluna 0.
+    O workbook é materializado numa única passada; cabeçalho (linhas
+    0-2) e dados (linha 3 em diante) são fatiados da mesma lista, sem
+    reabrir o ZIP/XML (.xlsx) ou o workbook xlrd (.xls) duas vezes.
 
     Args:
         filepath: Caminho para o arquivo .xls ou .xlsx.
 
     Returns:
-        Lista de listas com os valores de cada linha (7 colunas).
+        Lista de linhas (listas ou tuplas) com até 7 colunas cada.
 
     Raises:
         FileNotFoundError: Se o arquivo não existir.
@@ -46,67 +68,76 @@ def _read_data_rows(filepath: str) -> list[list[Any]]:
         raise FileNotFoundError(f"Arquivo não encontrado: {filepath}")
 
     ext = os.path.splitext(filepath)[1].lower()
-
-    if ext == ".xls":
-        return _read_xls_data(filepath)
-    elif ext == ".xlsx":
-        return _read_xlsx_data(filepath)
-    else:
+    if ext not in (".xls", ".xlsx"):
         raise ValueError(
             f"Formato de arquivo não suportado: '{ext}'. Use .xls ou .xlsx."
         )
 
+    if CalamineWorkbook is not None:
+        sheet = CalamineWorkbook.from_path(filepath).get_sheet_by_index(0)
+        return [list(r[:7]) for r in sheet.to_python(skip_empty_area=False)]
+    if ext == ".xls":
+        return _read_xls_rows(filepath)
+    return _read_xlsx_rows(filepath)
 
-def _read_xls_data(filepath: str) -> list[list[Any]]:
-    """Lê dados de um arquivo .xls (Excel 97-2003) via xlrd."""
+
+def _read_xls_rows(filepath: str) -> list[list[Any]]:
+    """Lê todas as linhas de um arquivo .xls (Excel 97-2003) via xlrd."""
     import xlrd
 
     workbook = xlrd.open_workbook(filepath)
     sheet = workbook.sheet_by_index(0)
-    rows: list[list[Any]] = []
-
-    # Dados começam na linha 3 (0-indexed), cabeçalho são linhas 0-2
-    for row_idx in range(3, sheet.nrows):
-        row: list[Any] = []
-        for col_idx in range(min(7, sheet.ncols)):
-            row.append(sheet.cell_value(row_idx, col_idx))
-
-        # Parar ao encontrar "Total Geral"
-        cell0 = str(row[0]).strip() if row and row[0] else ""
-        if "total geral" in cell0.lower():
-            break
-
-        rows.append(row)
-
-    return rows
+    return [
+        [
+            sheet.cell_value(row_idx, col_idx)
+            for col_idx in range(min(7, sheet.ncols))
+        ]
+        for row_idx in range(sheet.nrows)
+    ]
 
 
-def _read_xlsx_data(filepath: str) -> list[list[Any]]:
-    """Lê dados de um arquivo .xlsx via openpyxl."""
+def _read_xlsx_rows(filepath: str) -> list[tuple[Any, ...]]:
+    """Lê todas as linhas de um arquivo .xlsx via openpyxl."""
     import openpyxl
 
     workbook = openpyxl.load_workbook(filepath, read_only=True, data_only=True)
     sheet = workbook.active
-    rows: list[list[Any]] = []
+    # values_only já devolve tuplas prontas; mantê-las evita uma cópia
+    # em lista por linha (ninguém muta as linhas rio abaixo)
+    rows = list(sheet.iter_rows(max_col=7, values_only=True))
+    workbook.close()
+    return rows
 
-    for row_idx, row in enumerate(
-        sheet.iter_rows(max_col=7, values_only=True)
-    ):
-        # Pular cabeçalho (linhas 0-2)
-        if row_idx < 3:
-            continue
 
-        row_list = list(row)
+def _iter_data_rows(all_rows: list[list[Any]]) -> Iterator[list[Any]]:
+    """Gera as linhas de dados (a partir da linha 3) até o "Total Geral".
 
+    Generator em vez de lista: o consumidor (``from_records``) drena as
+    linhas direto da fonte, sem materializar uma cópia intermediária —
+    metade do pico de memória na etapa de parse.
+    """
+    for row in islice(all_rows, 3, None):
+        cell0 = row[0] if row else None
+        # Fast path: códigos de conta começam com dígito — a checagem de
+        # "Total Geral" (str/strip/lower + busca) só roda nas exceções
+        if isinstance(cell0, str) and cell0[:1].isdigit():
+            yield row
+            continue
         # Parar ao encontrar "Total Geral"
-        cell0 = str(row_list[0]).strip() if row_list and row_list[0] else ""
-        if "total geral" in cell0.lower():
-            break
+        texto = str(cell0).strip() if cell0 else ""
+        if "total geral" in texto.lower():
+            return
+        yield row
 
-        rows.append(row_list)
 
-    workbook.close()
-    return rows
+def _slice_data_rows(all_rows: list[list[Any]]) -> list[list[Any]]:
+    """Fatia as linhas de dados (atalho: materializa o generator)."""
+    return list(_iter_data_rows(all_rows))
+
+
+def _read_data_rows(filepath: str) -> list[list[Any]]:
+    """Lê as linhas de dados do balancete (atalho: abre e fatia)."""
+    return _slice_data_rows(_read_all_rows(filepath))
 
 
 def _determine_account_level(codigo: str) -> int:
@@ -126,7 +157,8 @@ def _determine_account_level(codigo: str) -> int:
     """
     if not codigo:
         return 0
-    return len(codigo.split("."))
+    # count() é uma varredura C sem alocar a lista do split
+    return codigo.count(".") + 1
 
 
 def _get_account_group(codigo: str) -> tuple[str, int]:
@@ -144,13 +176,14 @@ def _get_account_group(codigo: str) -> tuple[str, int]:
     if not codigo:
         raise ValueError("Código de conta vazio.")
 
-    first_char = codigo[0]
-    if first_char in _GROUP_MAP:
-        return _GROUP_MAP[first_char]
+    d = ord(codigo[0]) - 48  # ord('0')
+    if 1 <= d <= 5:
+        return _GROUP_TABLE[d]  # type: ignore[return-value]
 
     raise ValueError(
         f"Grupo contábil desconhecido para conta '{codigo}'. "
-        f"Primeiro caractere '{first_char}' não está no mapa: {list(_GROUP_MAP.keys())}"
+        f"Primeiro caractere '{codigo[0]}' não está na tabela: "
+        "['1', '2', '3', '4', '5']"
     )
 
 
@@ -186,90 +219,157 @@ def parse_balancete(filepath: str) -> tuple[dict, pd.DataFrame]:
         FileNotFoundError: Se o arquivo não existir.
         ValueError: Se o formato não for suportado ou dados estiverem corrompidos.
     """
-    # 1) Extrair header
-    header = extract_header(filepath)
+    # Cache por (caminho, mtime, tamanho): re-parses do mesmo arquivo na
+    # mesma sessão (dashboards, re-uploads) viram um lookup; qualquer
+    # mudança no arquivo troca a chave e invalida naturalmente
+    if not os.path.isfile(filepath):
+        raise FileNotFoundError(f"Arquivo não encontrado: {filepath}")
+    st = os.stat(filepath)
+    header, df = _parse_balancete_cached(filepath, st.st_mtime_ns, st.st_size)
+    # Cópias rasas: o chamador pode mutar sem corromper o cache
+    return dict(header), df.copy()
+
+
+@lru_cache(maxsize=32)
+def _parse_balancete_cached(
+    filepath: str, _mtime_ns: int, _size: int
+) -> tuple[dict, pd.DataFrame]:
+    """Corpo do parse memoizado; a chave extra (mtime, size) versiona o arquivo."""
+    # 1) Abrir o arquivo uma única vez (cabeçalho + dados)
+    all_rows = _read_all_rows(filepath)
+
+    # 2) Extrair header das 3 primeiras linhas e fatiar os dados
+    header = extract_header_from_rows(all_rows[:3])
     periodo = header["mes_referencia"]
 
-    # 2) Ler dados brutos
-    raw_rows = _read_data_rows(filepath)
+    # 3) Parsear as colunas de forma vetorizada, drenando o generator de
+    # linhas direto no from_records (sem lista intermediária)
+    # Colunas: 0=Conta, 1=Red, 2=Título, 3=Saldo Ant, 4=Débitos,
+    # 5=Créditos, 6=Saldo Atual
+    _COLS = 7
+    base = pd.DataFrame.from_records(
+        ((tuple(r) + (None,) * _COLS)[:_COLS] for r in _iter_data_rows(all_rows)),
+        columns=[
+            "codigo_conta",
+            "red",
+            "titulo_conta",
+            "saldo_anterior",
+            "debitos",
+            "creditos",
+            "saldo_atual",
+        ],
+    )
+
+    # Pular linhas vazias
+    codigo_s = base["codigo_conta"].fillna("").astype(str).str.strip()
+    keep = codigo_s != ""
+    base = base.loc[keep].reset_index(drop=True)
+    codigo_s = codigo_s.loc[keep].reset_index(drop=True)
 
-    if not raw_rows:
+    if base.empty:
         raise ValueError("Nenhuma linha de dados encontrada no balancete.")
 
-    # 3) Parsear cada linha
-    records: list[dict] = []
+    titulo_s = base["titulo_conta"].fillna("").astype(str).str.strip()
 
-    for row in raw_rows:
-        # Colunas: 0=Conta, 1=Red, 2=Título, 3=Saldo Ant, 4=Débitos, 5=Créditos, 6=Saldo Atual
-        codigo_conta = str(row[0]).strip() if row[0] is not None else ""
+    # Red (pode ser int, float, ou vazio). trunc antes do cast Int32:
+    # valores não-inteiros como "3.7" viram 3 (mesma semântica de
+    # int(float(x)) do caminho escalar) em vez de estourar TypeError
+    # no astype; NaN atravessa o trunc e vira pd.NA.
+    red_s = np.trunc(pd.to_numeric(base["red"], errors="coerce"))
 
-        # Pular linhas vazias
-        if not codigo_conta:
-            continue
+    # Nível: quantidade de partes separadas por ponto
+    nivel_s = codigo_s.str.count(r"\.") + 1
 
-        titulo_conta = str(row[2]).strip() if len(row) > 2 and row[2] is not None else ""
-
-        # Red (pode ser int, float, ou vazio)
-        red_raw = row[1] if len(row) > 1 else None
-        red: int | None = None
-        if red_raw is not None and str(red_raw).strip():
-            try:
-                red = int(float(str(red_raw).strip()))
-            except (ValueError, TypeError):
-                red = None
-
-        # Nível
-        nivel = _determine_account_level(codigo_conta)
-
-        # Grupo
-        grupo, grupo_num = _get_account_group(codigo_conta)
-
-        # Valores
-        saldo_ant_str = str(row[3]) if len(row) > 3 and row[3] is not None else "0,00"
-        debitos_str = str(row[4]) if len(row) > 4 and row[4] is not None else "0,00"
-        creditos_str = str(row[5]) if len(row) > 5 and row[5] is not None else "0,00"
-        saldo_atual_str = str(row[6]) if len(row) > 6 and row[6] is not None else "0,00"
-
-        saldo_ant_val, saldo_ant_ind = parse_brazilian_value(saldo_ant_str)
-        debitos_val, _ = parse_brazilian_value(debitos_str)
-        creditos_val, _ = parse_brazilian_value(creditos_str)
-        saldo_atual_val, saldo_atual_ind = parse_brazilian_value(saldo_atual_str)
-
-        # Aplicar sinais
-        saldo_anterior = apply_sign(saldo_ant_val, saldo_ant_ind, grupo_num)
-        saldo_atual = apply_sign(saldo_atual_val, saldo_atual_ind, grupo_num)
-
-        records.append(
-            {
-                "codigo_conta": codigo_conta,
-                "titulo_conta": titulo_conta,
-                "red": red,
-                "nivel": nivel,
-                "tipo": "",  # será preenchido depois
-                "grupo": grupo,
-                "grupo_num": grupo_num,
-                "saldo_anterior": saldo_anterior,
-                "debitos": abs(debitos_val),
-                "creditos": abs(creditos_val),
-                "saldo_atual": saldo_atual,
-                "indicador_dc": saldo_atual_ind,
-                "periodo": periodo,
-            }
+    # Grupo pelo primeiro dígito da conta: o dígito vira índice direto
+    # nos arrays espelho de _GROUP_TABLE (fancy indexing, sem hash)
+    digits = pd.to_numeric(codigo_s.str[0], errors="coerce")
+    invalid = ~digits.between(1, 5)
+    if invalid.any():
+        codigo_ruim = codigo_s[invalid].iloc[0]
+        raise ValueError(
+            f"Grupo contábil desconhecido para conta '{codigo_ruim}'. "
+            f"Primeiro caractere '{codigo_ruim[0]}' não está na tabela: "
+            "['1', '2', '3', '4', '5']"
         )
+    idx = digits.to_numpy(dtype=np.int8)
+    grupo_s = pd.Series(_GRUPO_NOMES[idx], index=codigo_s.index)
+    grupo_num_s = pd.Series(_GRUPO_NUMS[idx], index=codigo_s.index)
+
+    # Valores no formato brasileiro, uma coluna por vez
+    saldo_ant_val, saldo_ant_ind = parse_brazilian_series(base["saldo_anterior"])
+    debitos_val, _ = parse_brazilian_series(base["debitos"])
+    creditos_val, _ = parse_brazilian_series(base["creditos"])
+    saldo_atual_val, saldo_atual_ind = parse_brazilian_series(base["saldo_atual"])
+
+    # 4) Determinar tipo (Macro vs Último Nível): uma conta é Macro se a
+    # linha seguinte desce um nível; a última é sempre Último Nível
+    # (shift(-1) com fill 0 cobre os dois casos numa comparação só)
+    tipos = np.where(
+        nivel_s.shift(-1, fill_value=0) > nivel_s, "Macro", "Último Nível"
+    )
 
-    # 4) Determinar tipo (Macro vs Último Nível)
-    for i, rec in enumerate(records):
-        if i + 1 < len(records):
-            next_nivel = records[i + 1]["nivel"]
-            if next_nivel > rec["nivel"]:
-                rec["tipo"] = "Macro"
-            else:
-                rec["tipo"] = "Último Nível"
-        else:
-            # Última linha é sempre Último Nível
-            rec["tipo"] = "Último Nível"
-
-    # 5) Montar DataFrame
-    df = pd.DataFrame(records)
+    # 5) Montar DataFrame — copy=False adota os arrays já tipados das
+    # etapas anteriores em vez de recopiá-los na construção
+    df = pd.DataFrame(
+        {
+            "codigo_conta": codigo_s,
+            "titulo_conta": titulo_s,
+            "red": red_s,
+            "nivel": nivel_s,
+            "tipo": tipos,
+            "grupo": grupo_s,
+            "grupo_num": grupo_num_s,
+            "saldo_anterior": apply_sign_series(saldo_ant_val, saldo_ant_ind),
+            "debitos": debitos_val.abs(),
+            "creditos": creditos_val.abs(),
+            "saldo_atual": apply_sign_series(saldo_atual_val, saldo_atual_ind),
+            "indicador_dc": saldo_atual_ind,
+            "periodo": periodo,
+        },
+        copy=False,
+    )
+
+    # Downcasts: nivel/grupo_num cabem em int8 e as colunas de rótulos
+    # têm cardinalidade baixa — categorias cortam a memória do DataFrame
+    # e aceleram filtros/groupby rio abaixo
+    df = df.astype(
+        {
+            "red": "Int32",
+            "nivel": "int8",
+            "grupo_num": "int8",
+            "grupo": "category",
+            "tipo": "category",
+            "indicador_dc": "category",
+            "periodo": "category",
+        }
+    )
 
     return header, df
+
+
+# Acessor no símbolo público, no espírito do functools
+parse_balancete.cache_clear = _parse_balancete_cached.cache_clear  # type: ignore[attr-defined]
+
+
+def parse_balancetes(
+    paths: list[str], workers: int | None = None
+) -> list[tuple[dict, pd.DataFrame]]:
+    """Parseia vários balancetes em paralelo com um pool de processos.
+
+    ``parse_balancete`` é uma função pura do caminho do arquivo e os
+    leitores de Excel liberam pouco o GIL — processos escalam quase
+    linearmente com os cores ao parsear os balancetes mensais de um ano.
+
+    Args:
+        paths: Caminhos dos arquivos .xls/.xlsx, na ordem desejada.
+        workers: Número de processos (padrão: quantidade de CPUs).
+
+    Returns:
+        Lista de tuplas (header, dataframe), na mesma ordem de ``paths``.
+    """
+    if len(paths) <= 1:
+        # Um arquivo só não paga o fork/spawn do pool
+        return [parse_balancete(p) for p in paths]
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(parse_balancete, paths))
+
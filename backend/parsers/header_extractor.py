@@ -9,8 +9,172 @@ from __future__ import annotations
 
 import os
 import re
+import zipfile
+import xml.etree.ElementTree as ET
 from datetime import datetime
 
+# Padrões compilados uma única vez no import — o caminho do cabeçalho
+# não paga lookup/canonicalização no cache do módulo re por arquivo
+_RE_PERIODO = re.compile(
+    r"Per[ií]odo:\s*(\d{2}/\d{2}/\d{4})\s*[àa]\s*(\d{2}/\d{2}/\d{4})",
+    re.IGNORECASE,
+)
+
+# CNPJ e Emissão têm layout fixo ("rótulo: valor") — partition + checagem
+# posicional dispensam o motor de regex nos dois campos mais repetidos
+_CNPJ_CHARS = frozenset("0123456789./-")
+
+
+def _iso_date(d: datetime) -> str:
+    """Formata "YYYY-MM-DD" com f-string — sem a máquina do strftime."""
+    return f"{d.year:04d}-{d.month:02d}-{d.day:02d}"
+
+
+def _parse_ddmmyyyy(s: str) -> datetime:
+    """Converte "DD/MM/AAAA" por fatiamento — sem o parser do strptime."""
+    return datetime(int(s[6:10]), int(s[3:5]), int(s[0:2]))
+
+
+def _parse_ddmmyyyy_hms(data: str, hora: str) -> datetime:
+    """Converte "DD/MM/AAAA" + "HH:MM:SS" por fatiamento."""
+    return datetime(
+        int(data[6:10]),
+        int(data[3:5]),
+        int(data[0:2]),
+        int(hora[0:2]),
+        int(hora[3:5]),
+        int(hora[6:8]),
+    )
+
+
+def _is_cnpj(texto: str) -> bool:
+    """Valida o formato XX.XXX.XXX/XXXX-XX (ou dígitos/pontuação crus)."""
+    if (
+        len(texto) == 18
+        and texto[2] == "."
+        and texto[6] == "."
+        and texto[10] == "/"
+        and texto[15] == "-"
+    ):
+        return True
+    # Formatos fora do padrão (ex.: sem máscara) seguem aceitos, como no
+    # regex antigo [\d./-]+
+    return bool(texto) and all(c in _CNPJ_CHARS for c in texto)
+
+
+# Namespaces do SpreadsheetML (OOXML)
+_XLSX_NS = "{http://schemas.openxmlformats.org/spreadsheetml/2006/main}"
+_REL_ATTR = (
+    "{http://schemas.openxmlformats.org/officeDocument/2006/relationships}id"
+)
+
+
+def _col_index(ref: str) -> int | None:
+    """Converte a referência de célula ("F1") em índice de coluna (5)."""
+    n = 0
+    for ch in ref:
+        if ch.isdigit():
+            break
+        n = n * 26 + (ord(ch) - 64)  # 'A' == 65
+    return n - 1 if n else None
+
+
+def _read_shared_strings(zf: zipfile.ZipFile, max_idx: int) -> list[str]:
+    """Lê a tabela de shared strings só até o índice necessário."""
+    strings: list[str] = []
+    with zf.open("xl/sharedStrings.xml") as fh:
+        for _event, elem in ET.iterparse(fh, events=("end",)):
+            if elem.tag != _XLSX_NS + "si":
+                continue
+            strings.append("".join(t.text or "" for t in elem.iter(_XLSX_NS + "t")))
+            elem.clear()
+            if len(strings) > max_idx:
+                break
+    return strings
+
+
+def _first_sheet_part(zf: zipfile.ZipFile) -> str | None:
+    """Resolve o part name da primeira planilha do workbook.
+
+    Os nomes de part não são posicionais — a primeira aba de um workbook
+    pode não ser ``sheet1.xml``. O caminho certo é o ``r:id`` do primeiro
+    ``<sheet>`` em ``workbook.xml``, resolvido pelos relationships.
+    """
+    with zf.open("xl/workbook.xml") as fh:
+        sheet = ET.parse(fh).getroot().find(
+            f"{_XLSX_NS}sheets/{_XLSX_NS}sheet"
+        )
+    if sheet is None:
+        return None
+    rid = sheet.get(_REL_ATTR)
+    if not rid:
+        return None
+    with zf.open("xl/_rels/workbook.xml.rels") as fh:
+        rels = ET.parse(fh).getroot()
+    for rel in rels.iter():
+        if rel.get("Id") == rid:
+            target = rel.get("Target", "")
+            # Target relativo a xl/; absoluto ("/xl/...") vem com barra
+            return target.lstrip("/") if target.startswith("/") else f"xl/{target}"
+    return None
+
+
+def _read_xlsx_header_fast(filepath: str) -> list[list] | None:
+    """Lê as 3 primeiras linhas de um .xlsx direto do XML, sem openpyxl.
+
+    ``load_workbook(read_only=True)`` ainda materializa a tabela de
+    shared strings inteira no open — segundos num workbook de 100k+
+    linhas. Aqui o ``iterparse`` para no terceiro ``</row>`` e a SST é
+    lida só até o maior índice referenciado pelo cabeçalho.
+
+    Returns:
+        As linhas lidas (até 3, com 7 colunas cada), ou ``None`` se o
+        arquivo fugir do layout esperado — o chamador cai no openpyxl.
+    """
+    try:
+        with zipfile.ZipFile(filepath) as zf:
+            part = _first_sheet_part(zf) or "xl/worksheets/sheet1.xml"
+            rows: list[list] = []
+            sst_refs: list[tuple[int, int, int]] = []  # (linha, col, índice SST)
+            with zf.open(part) as fh:
+                for _event, elem in ET.iterparse(fh, events=("end",)):
+                    if elem.tag != _XLSX_NS + "row":
+                        continue
+                    row: list = [None] * 7
+                    for cell in elem.iter(_XLSX_NS + "c"):
+                        col = _col_index(cell.get("r", ""))
+                        if col is None or col >= 7:
+                            continue
+                        tipo = cell.get("t")
+                        if tipo == "inlineStr":
+                            t = cell.find(f"{_XLSX_NS}is/{_XLSX_NS}t")
+                            row[col] = t.text if t is not None else None
+                            continue
+                        v = cell.find(_XLSX_NS + "v")
+                        if v is None or v.text is None:
+                            continue
+                        if tipo == "s":
+                            sst_refs.append((len(rows), col, int(v.text)))
+                        elif tipo == "str":
+                            row[col] = v.text
+                        else:
+                            num = float(v.text)
+                            row[col] = int(num) if num.is_integer() else num
+                    rows.append(row)
+                    elem.clear()
+                    if len(rows) >= 3:
+                        break
+            if sst_refs:
+                strings = _read_shared_strings(
+                    zf, max(i for _, _, i in sst_refs)
+                )
+                for linha, col, i in sst_refs:
+                    if i < len(strings):
+                        rows[linha][col] = strings[i]
+            return rows
+    except (KeyError, zipfile.BadZipFile, ET.ParseError, ValueError):
+        return None
+
 
 def _read_header_rows(filepath: str) -> list[list]:
     """Lê as 3 primeiras linhas do arquivo Excel.
@@ -44,6 +208,11 @@ def _read_header_rows(filepath: str) -> list[list]:
         return rows
 
     elif ext == ".xlsx":
+        # Fast path: XML cru via zipfile/iterparse, parando na linha 3
+        rows = _read_xlsx_header_fast(filepath)
+        if rows is not None:
+            return rows
+
         import openpyxl
 
         workbook = openpyxl.load_workbook(filepath, read_only=True, data_only=True)
@@ -84,8 +253,22 @@ def extract_header(filepath: str) -> dict:
     Raises:
         ValueError: Se não conseguir parsear os campos obrigatórios.
     """
-    rows = _read_header_rows(filepath)
+    return extract_header_from_rows(_read_header_rows(filepath))
+
+
+def extract_header_from_rows(rows: list[list]) -> dict:
+    """Extrai os metadados do cabeçalho a partir de linhas já lidas.
+
+    Mesmo contrato de :func:`extract_header`, mas recebe as linhas
+    diretamente — permite que ``parse_balancete`` abra o arquivo uma
+    única vez e compartilhe as linhas entre cabeçalho e dados.
 
+    Args:
+        rows: As 3 primeiras linhas do arquivo (listas de valores).
+
+    Raises:
+        ValueError: Se não conseguir parsear os campos obrigatórios.
+    """
     if len(rows) < 2:
         raise ValueError(
             f"Arquivo tem apenas {len(rows)} linhas. Esperado pelo menos 2 linhas de cabeçalho."
@@ -101,52 +284,44 @@ def extract_header(filepath: str) -> dict:
 
     # Período (coluna 5)
     periodo_str = str(row0[5]).strip() if len(row0) > 5 and row0[5] else ""
-    periodo_match = re.search(
-        r"Per[ií]odo:\s*(\d{2}/\d{2}/\d{4})\s*[àa]\s*(\d{2}/\d{2}/\d{4})",
-        periodo_str,
-        re.IGNORECASE,
-    )
+    periodo_match = _RE_PERIODO.search(periodo_str)
     if not periodo_match:
         raise ValueError(
             f"Não foi possível extrair o período da linha 0, coluna 5: '{periodo_str}'"
         )
 
-    periodo_inicio = datetime.strptime(periodo_match.group(1), "%d/%m/%Y")
-    periodo_fim = datetime.strptime(periodo_match.group(2), "%d/%m/%Y")
+    # Datas em largura fixa: fatiamento direto evita o strptime (parser
+    # de format-string, ciente de locale) nos 3 campos de data
+    periodo_inicio = _parse_ddmmyyyy(periodo_match.group(1))
+    periodo_fim = _parse_ddmmyyyy(periodo_match.group(2))
 
     # --- Linha 1 ---
     row1 = rows[1]
 
-    # CNPJ (coluna 0)
+    # CNPJ (coluna 0) — "CNPJ: XX.XXX.XXX/XXXX-XX"
     cnpj_str = str(row1[0]).strip() if len(row1) > 0 and row1[0] else ""
-    cnpj_match = re.search(
-        r"CNPJ:\s*([\d./-]+)",
-        cnpj_str,
-        re.IGNORECASE,
-    )
-    if not cnpj_match:
+    _, sep, resto = cnpj_str.partition(":")
+    cnpj = resto.strip() if sep else ""
+    if not _is_cnpj(cnpj):
         raise ValueError(
             f"Não foi possível extrair o CNPJ da linha 1, coluna 0: '{cnpj_str}'"
         )
-    cnpj = cnpj_match.group(1).strip()
 
-    # Emissão (coluna 5)
+    # Emissão (coluna 5) — "Emissão: DD/MM/AAAA HH:MM:SS" (largura fixa)
     emissao_str = str(row1[5]).strip() if len(row1) > 5 and row1[5] else ""
-    emissao_match = re.search(
-        r"Emiss[ãa]o:\s*(\d{2}/\d{2}/\d{4})\s+(\d{2}:\d{2}:\d{2})",
-        emissao_str,
-        re.IGNORECASE,
-    )
-    if not emissao_match:
+    _, sep, resto = emissao_str.partition(":")
+    partes = resto.split() if sep else []
+    try:
+        if len(partes) != 2 or len(partes[0]) != 10 or len(partes[1]) != 8:
+            raise ValueError(emissao_str)
+        emissao = _parse_ddmmyyyy_hms(partes[0], partes[1])
+    except ValueError:
         raise ValueError(
             f"Não foi possível extrair a emissão da linha 1, coluna 5: '{emissao_str}'"
-        )
-    emissao = datetime.strptime(
-        f"{emissao_match.group(1)} {emissao_match.group(2)}", "%d/%m/%Y %H:%M:%S"
-    )
+        ) from None
 
-    # --- Derivados ---
-    mes_referencia = periodo_fim.strftime("%Y-%m")
+    # --- Derivados --- (f-strings no lugar do strftime, pelo mesmo motivo)
+    mes_referencia = f"{periodo_fim.year:04d}-{periodo_fim.month:02d}"
 
     # Tipo: anual se de 01/01 até 31/12 do mesmo ano (ou ano seguinte)
     is_anual = (
@@ -160,9 +335,12 @@ def extract_header(filepath: str) -> dict:
     return {
         "empresa": empresa,
         "cnpj": cnpj,
-        "periodo_inicio": periodo_inicio.strftime("%Y-%m-%d"),
-        "periodo_fim": periodo_fim.strftime("%Y-%m-%d"),
-        "emissao": emissao.strftime("%Y-%m-%dT%H:%M:%S"),
+        "periodo_inicio": _iso_date(periodo_inicio),
+        "periodo_fim": _iso_date(periodo_fim),
+        "emissao": (
+            f"{_iso_date(emissao)}T"
+            f"{emissao.hour:02d}:{emissao.minute:02d}:{emissao.second:02d}"
+        ),
         "mes_referencia": mes_referencia,
         "tipo": tipo,
     }
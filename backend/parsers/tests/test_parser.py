@@ -12,9 +12,15 @@ from __future__ import annotations
 import os
 import math
 
+import pandas as pd
 import pytest
 
-from backend.parsers.value_converter import apply_sign, parse_brazilian_value
+from backend.parsers.value_converter import (
+    apply_sign,
+    apply_sign_series,
+    parse_brazilian_series,
+    parse_brazilian_value,
+)
 
 
 # ============================================================================
@@ -131,6 +137,75 @@ class TestApplySign:
             apply_sign(100.0, "D", 9)
 
 
+class TestParseBrazilianSeries:
+    """Testes para parse_brazilian_series (caminho vetorizado)."""
+
+    def test_series_matches_scalar(self) -> None:
+        """Coluna mista produz os mesmos resultados do escalar, célula a célula."""
+        valores = [
+            "18.623.655,70D",
+            "1.234.567,89C",
+            "0,00",
+            "",
+            "  1.000,50D  ",
+            "500,00d",
+            "250,75c",
+            "R$ 1.000,50D",
+            None,
+            float("nan"),
+            1234.56,
+            10,
+        ]
+        vals, inds = parse_brazilian_series(pd.Series(valores, dtype=object))
+
+        for original, val, ind in zip(valores, vals, inds):
+            esperado_val, esperado_ind = parse_brazilian_value(original)
+            assert val == pytest.approx(esperado_val), repr(original)
+            assert ind == esperado_ind, repr(original)
+
+    def test_numeric_dtype_column(self) -> None:
+        """Coluna já numérica passa direto, sem tratamento BRL."""
+        vals, inds = parse_brazilian_series(
+            pd.Series([1234.56, float("nan"), -10.0])
+        )
+        assert vals.tolist() == pytest.approx([1234.56, 0.0, -10.0])
+        assert inds.tolist() == ["", "", ""]
+
+    def test_lowercase_indicator_normalized(self) -> None:
+        """Indicador minúsculo vira maiúsculo, como no escalar."""
+        vals, inds = parse_brazilian_series(
+            pd.Series(["100,00d", "200,00c"], dtype=object)
+        )
+        assert inds.tolist() == ["D", "C"]
+        assert vals.tolist() == pytest.approx([100.0, 200.0])
+
+
+class TestApplySignSeries:
+    """Testes para apply_sign_series (caminho vetorizado)."""
+
+    def test_sign_application(self) -> None:
+        """D → +|v|, C → -|v|, vazio → 0."""
+        out = apply_sign_series(
+            pd.Series([1000.0, 1000.0, 500.0, 750.0]),
+            pd.Series(["D", "C", "", "C"]),
+        )
+        assert out.tolist() == pytest.approx([1000.0, -1000.0, 0.0, -750.0])
+
+    def test_negative_input_uses_abs(self) -> None:
+        """Valores negativos de entrada são normalizados por abs."""
+        out = apply_sign_series(pd.Series([-100.0]), pd.Series(["D"]))
+        assert out.tolist() == pytest.approx([100.0])
+
+    def test_parity_with_scalar(self) -> None:
+        """Mesma convenção do apply_sign escalar (igual em todos os grupos)."""
+        values = [1000.0, 500.0, 2000.0, 750.0]
+        indicators = ["D", "C", "C", ""]
+        out = apply_sign_series(pd.Series(values), pd.Series(indicators))
+        for grupo in (1, 2, 3, 4):
+            for val, ind, res in zip(values, indicators, out):
+                assert res == pytest.approx(apply_sign(val, ind, grupo))
+
+
 # ============================================================================
 # Testes de header_extractor (unitários com regex)
 # ============================================================================
@@ -178,10 +253,138 @@ class TestHeaderRegex:
 
 
 # ============================================================================
-# Testes do nível e grupo de contas
+# Testes do fast path de leitura do cabeçalho .xlsx
 # ============================================================================
 
 
+def _write_header_xlsx(path: str) -> None:
+    """Escreve um .xlsx mínimo com o layout de cabeçalho Hinova."""
+    from openpyxl import Workbook
+
+    wb = Workbook()
+    ws = wb.active
+    ws.title = "Dados"
+    ws["A1"] = "EMPRESA TESTE LTDA"
+    ws["F1"] = "Período: 01/01/2025 à 31/01/2025"
+    ws["A2"] = "CNPJ: 12.345.678/0001-90"
+    ws["F2"] = "Emissão: 05/02/2025 10:30:00"
+    ws["A3"] = "Conta"
+    ws["B3"] = "Título"
+    wb.save(path)
+
+
+class TestXlsxHeaderFast:
+    """Testes do leitor de cabeçalho via zipfile/iterparse."""
+
+    def test_fast_path_matches_openpyxl(self, tmp_path) -> None:
+        """Fast path e fallback openpyxl leem as mesmas linhas."""
+        import openpyxl
+
+        from backend.parsers.header_extractor import _read_xlsx_header_fast
+
+        path = str(tmp_path / "balancete.xlsx")
+        _write_header_xlsx(path)
+
+        fast = _read_xlsx_header_fast(path)
+        assert fast is not None
+
+        wb = openpyxl.load_workbook(path, read_only=True, data_only=True)
+        slow = [
+            list(row)
+            for row in wb.active.iter_rows(max_row=3, max_col=7, values_only=True)
+        ]
+        wb.close()
+
+        # Mesmo conteúdo nas células preenchidas (o fast path padde com None)
+        for fila_fast, fila_slow in zip(fast, slow):
+            for i, val in enumerate(fila_slow):
+                assert fila_fast[i] == val
+
+    def test_extract_header_via_fast_path(self, tmp_path) -> None:
+        """extract_header funciona sobre o fast path."""
+        from backend.parsers.header_extractor import extract_header
+
+        path = str(tmp_path / "balancete.xlsx")
+        _write_header_xlsx(path)
+
+        header = extract_header(path)
+        assert header["empresa"] == "EMPRESA TESTE LTDA"
+        assert header["cnpj"] == "12.345.678/0001-90"
+        assert header["periodo_inicio"] == "2025-01-01"
+        assert header["periodo_fim"] == "2025-01-31"
+        assert header["emissao"] == "2025-02-05T10:30:00"
+        assert header["mes_referencia"] == "2025-01"
+        assert header["tipo"] == "mensal"
+
+    def test_first_sheet_is_not_sheet1_part(self, tmp_path) -> None:
+        """Primeira aba em outro part (não sheet1.xml) é resolvida via rels."""
+        import re
+        import zipfile
+
+        from openpyxl import load_workbook
+
+        from backend.parsers.header_extractor import _read_xlsx_header_fast
+
+        path = str(tmp_path / "balancete.xlsx")
+        _write_header_xlsx(path)
+
+        # Segunda aba "Extra" (part sheet2.xml), com conteúdo distinto
+        wb = load_workbook(path)
+        extra = wb.create_sheet("Extra")
+        extra["A1"] = "não é o cabeçalho"
+        wb.save(path)
+
+        # Inverte a ordem dos <sheet> em workbook.xml direto no zip:
+        # a primeira aba listada passa a viver em sheet2.xml — ler
+        # sheet1.xml fixo devolveria a aba errada
+        with zipfile.ZipFile(path) as zf:
+            items = {nome: zf.read(nome) for nome in zf.namelist()}
+        wbxml = items["xl/workbook.xml"].decode()
+        sheets = re.findall(r"<sheet [^>]*/>", wbxml)
+        assert len(sheets) == 2
+        wbxml = wbxml.replace(
+            sheets[0] + sheets[1], sheets[1] + sheets[0]
+        )
+        assert 'name="Extra"' in re.findall(r"<sheet [^>]*/>", wbxml)[0]
+        items["xl/workbook.xml"] = wbxml.encode()
+        with zipfile.ZipFile(path, "w") as zf:
+            for nome, dados in items.items():
+                zf.writestr(nome, dados)
+
+        rows = _read_xlsx_header_fast(path)
+        assert rows is not None
+        assert rows[0][0] == "não é o cabeçalho"
+
+
+class TestRedNaoInteiro:
+    """Red com valor fracionário não pode derrubar o parse inteiro."""
+
+    def test_red_fracionario_trunca_sem_estourar(self, tmp_path) -> None:
+        """Red "3.7" vira 3 (truncado), como no caminho escalar antigo."""
+        from openpyxl import load_workbook
+
+        from backend.parsers.balancete_parser import parse_balancete
+
+        path = str(tmp_path / "balancete.xlsx")
+        _write_header_xlsx(path)
+
+        wb = load_workbook(path)
+        ws = wb.active
+        ws.append(["1", 1, "ATIVO", "0,00", "0,00", "0,00", "100,00D"])
+        ws.append(["1.01", "3.7", "CAIXA", "0,00", "0,00", "0,00", "100,00D"])
+        ws.append(["1.02", None, "BANCOS", "0,00", "0,00", "0,00", "0,00"])
+        wb.save(path)
+
+        # Antes do trunc, o astype Int32 estourava TypeError aqui —
+        # fora do contrato documentado (ValueError) do parser
+        _, df = parse_balancete(path)
+
+        assert str(df["red"].dtype) == "Int32"
+        assert df["red"].iloc[0] == 1
+        assert df["red"].iloc[1] == 3
+        assert pd.isna(df["red"].iloc[2])
+
+
 class TestAccountHelpers:
     """Testes para helpers internos do parser."""
 
@@ -281,38 +484,42 @@ _test_file = _find_test_file()
 _skip_integration = _test_file is None
 
 
+@pytest.fixture(scope="module")
+def parsed_balancete() -> tuple[dict, object]:
+    """Parseia o arquivo de teste uma única vez por módulo.
+
+    Evita repetir a leitura do .xls/.xlsx em cada teste de integração —
+    cada caso recebe a mesma tupla ``(header, df)``.
+    """
+    from backend.parsers.balancete_parser import parse_balancete
+
+    assert _test_file is not None
+    return parse_balancete(_test_file)
+
+
 @pytest.mark.skipif(_skip_integration, reason="Arquivo de teste de balancete não encontrado")
 class TestBalanceteIntegration:
     """Testes de integração que dependem de um arquivo real de balancete."""
 
-    def test_total_geral_not_in_dataframe(self) -> None:
+    def test_total_geral_not_in_dataframe(self, parsed_balancete) -> None:
         """'Total Geral' não deve estar no DataFrame."""
-        from backend.parsers.balancete_parser import parse_balancete
-
-        assert _test_file is not None
-        _, df = parse_balancete(_test_file)
+        _, df = parsed_balancete
         assert not df["codigo_conta"].str.contains("Total Geral", case=False, na=False).any(), (
             "'Total Geral' encontrado no DataFrame — deveria ter sido excluído."
         )
 
-    def test_conta_1_is_macro(self) -> None:
+    def test_conta_1_is_macro(self, parsed_balancete) -> None:
         """A conta '1' deve ter tipo 'Macro'."""
-        from backend.parsers.balancete_parser import parse_balancete
-
-        assert _test_file is not None
-        _, df = parse_balancete(_test_file)
+        _, df = parsed_balancete
         conta_1 = df[df["codigo_conta"] == "1"]
         assert not conta_1.empty, "Conta '1' não encontrada no DataFrame."
         assert conta_1.iloc[0]["tipo"] == "Macro", (
             f"Conta '1' deveria ser 'Macro', mas é '{conta_1.iloc[0]['tipo']}'."
         )
 
-    def test_conta_ultimo_nivel(self) -> None:
+    def test_conta_ultimo_nivel(self, parsed_balancete) -> None:
         """A conta '1.01.01.02.00004' deve ter tipo 'Último Nível'."""
-        from backend.parsers.balancete_parser import parse_balancete
-
-        assert _test_file is not None
-        _, df = parse_balancete(_test_file)
+        _, df = parsed_balancete
         conta = df[df["codigo_conta"] == "1.01.01.02.00004"]
         assert not conta.empty, "Conta '1.01.01.02.00004' não encontrada no DataFrame."
         assert conta.iloc[0]["tipo"] == "Último Nível", (
@@ -320,12 +527,9 @@ class TestBalanceteIntegration:
             f"mas é '{conta.iloc[0]['tipo']}'."
         )
 
-    def test_saldo_ativo_soma(self) -> None:
+    def test_saldo_ativo_soma(self, parsed_balancete) -> None:
         """O saldo da conta '1' deve ≈ saldo de '1.01' + '1.02'."""
-        from backend.parsers.balancete_parser import parse_balancete
-
-        assert _test_file is not None
-        _, df = parse_balancete(_test_file)
+        _, df = parsed_balancete
 
         saldo_1 = df[df["codigo_conta"] == "1"]["saldo_atual"].values
         saldo_101 = df[df["codigo_conta"] == "1.01"]["saldo_atual"].values
@@ -341,12 +545,9 @@ class TestBalanceteIntegration:
             f"'1.01' ({saldo_101[0]}) + '1.02' ({saldo_102[0]}) = {soma}"
         )
 
-    def test_header_extraction(self) -> None:
+    def test_header_extraction(self, parsed_balancete) -> None:
         """O header deve conter todos os campos obrigatórios."""
-        from backend.parsers.balancete_parser import parse_balancete
-
-        assert _test_file is not None
-        header, _ = parse_balancete(_test_file)
+        header, _ = parsed_balancete
 
         required_keys = [
             "empresa", "cnpj", "periodo_inicio", "periodo_fim",
@@ -358,99 +559,37 @@ class TestBalanceteIntegration:
 
 
 # ============================================================================
-# Função test_parser() para uso direto
+# Casos parametrizados (ex-test_parser monolítica)
 # ============================================================================
 
 
-def test_parser() -> None:
-    """Executa todos os testes em sequência para validação rápida.
-
-    Pode ser chamada diretamente:
-        python -c "from backend.parsers.tests.test_parser import test_parser; test_parser()"
-
-    Ou via pytest:
-        python -m pytest backend/parsers/tests/test_parser.py -v
-    """
-    print("=" * 60)
-    print("TESTES DO PARSER DE BALANCETE HINOVA")
-    print("=" * 60)
-
-    # 1) Testes de value_converter
-    print("\n--- Testes value_converter ---")
-
-    val, ind = parse_brazilian_value("18.623.655,70D")
-    assert val == pytest.approx(18623655.70), f"Esperado 18623655.70, obteve {val}"
-    assert ind == "D", f"Esperado 'D', obteve '{ind}'"
-    print(f"  ✓ parse_brazilian_value('18.623.655,70D') → ({val}, '{ind}')")
-
-    val, ind = parse_brazilian_value("0,00")
-    assert val == pytest.approx(0.0)
-    assert ind == ""
-    print(f"  ✓ parse_brazilian_value('0,00') → ({val}, '{ind}')")
-
-    val, ind = parse_brazilian_value(None)
-    assert val == pytest.approx(0.0)
-    assert ind == ""
-    print(f"  ✓ parse_brazilian_value(None) → ({val}, '{ind}')")
-
-    assert apply_sign(1000.0, "D", 1) == pytest.approx(1000.0)
-    print("  ✓ apply_sign(1000, 'D', 1) → 1000.0")
-
-    assert apply_sign(1000.0, "C", 1) == pytest.approx(-1000.0)
-    print("  ✓ apply_sign(1000, 'C', 1) → -1000.0")
-
-    assert apply_sign(500.0, "C", 2) == pytest.approx(-500.0)
-    print("  ✓ apply_sign(500, 'C', 2) → -500.0")
-
-    # 2) Testes de integração (se arquivo disponível)
-    test_file = _find_test_file()
-    if test_file is None:
-        print("\n--- Testes de integração ---")
-        print("  ⚠ Nenhum arquivo de teste encontrado. Caminhos verificados:")
-        for p in _TEST_FILE_PATHS:
-            print(f"    - {os.path.abspath(p)}")
-        print("  ⚠ Testes de integração ignorados.\n")
-    else:
-        from backend.parsers.balancete_parser import parse_balancete
-
-        print(f"\n--- Testes de integração ({os.path.basename(test_file)}) ---")
-        header, df = parse_balancete(test_file)
-
-        # Total Geral não está no DF
-        assert not df["codigo_conta"].str.contains("Total Geral", case=False, na=False).any()
-        print("  ✓ 'Total Geral' não está no DataFrame")
-
-        # Conta "1" é Macro
-        conta_1 = df[df["codigo_conta"] == "1"]
-        assert not conta_1.empty
-        assert conta_1.iloc[0]["tipo"] == "Macro"
-        print("  ✓ Conta '1' tem tipo 'Macro'")
-
-        # Conta de último nível
-        conta_un = df[df["codigo_conta"] == "1.01.01.02.00004"]
-        if not conta_un.empty:
-            assert conta_un.iloc[0]["tipo"] == "Último Nível"
-            print("  ✓ Conta '1.01.01.02.00004' tem tipo 'Último Nível'")
-        else:
-            print("  ⚠ Conta '1.01.01.02.00004' não encontrada (ignorando)")
-
-        # Saldo ATIVO
-        saldo_1 = df[df["codigo_conta"] == "1"]["saldo_atual"].values
-        saldo_101 = df[df["codigo_conta"] == "1.01"]["saldo_atual"].values
-        saldo_102 = df[df["codigo_conta"] == "1.02"]["saldo_atual"].values
-        if len(saldo_1) > 0 and len(saldo_101) > 0 and len(saldo_102) > 0:
-            soma = saldo_101[0] + saldo_102[0]
-            assert saldo_1[0] == pytest.approx(soma, rel=1e-2)
-            print(f"  ✓ Saldo conta '1' ({saldo_1[0]:,.2f}) ≈ 1.01 + 1.02 ({soma:,.2f})")
-
-        print(f"\n  Header: {header}")
-        print(f"  DataFrame: {len(df)} linhas, {len(df.columns)} colunas")
-        print(f"  Contas: {df['codigo_conta'].nunique()} únicas")
-
-    print("\n" + "=" * 60)
-    print("TODOS OS TESTES PASSARAM ✓")
-    print("=" * 60)
+@pytest.mark.parametrize(
+    ("texto", "esperado_valor", "esperado_ind"),
+    [
+        ("18.623.655,70D", 18623655.70, "D"),
+        ("0,00", 0.0, ""),
+        (None, 0.0, ""),
+    ],
+)
+def test_parse_brazilian_value_casos(texto, esperado_valor, esperado_ind) -> None:
+    """Casos rápidos de parse_brazilian_value (antes na test_parser)."""
+    valor, ind = parse_brazilian_value(texto)
+    assert valor == pytest.approx(esperado_valor)
+    assert ind == esperado_ind
+
+
+@pytest.mark.parametrize(
+    ("valor", "indicador", "grupo", "esperado"),
+    [
+        (1000.0, "D", 1, 1000.0),
+        (1000.0, "C", 1, -1000.0),
+        (500.0, "C", 2, -500.0),
+    ],
+)
+def test_apply_sign_casos(valor, indicador, grupo, esperado) -> None:
+    """Casos rápidos de apply_sign (antes na test_parser)."""
+    assert apply_sign(valor, indicador, grupo) == pytest.approx(esperado)
 
 
 if __name__ == "__main__":
-    test_parser()
+    raise SystemExit(pytest.main([__file__, "-v"]))
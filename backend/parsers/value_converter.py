@@ -10,6 +10,14 @@ from __future__ import annotations
 import math
 import re
 
+import numpy as np
+import pandas as pd
+
+# Hoisted para o escopo do módulo: o parser roda uma vez por célula do
+# balancete — compilar/traduzir no import tira o lookup do caminho quente
+_CLEAN_RE = re.compile(r"[^\d.\-]")
+_BRL_TRANSLATE = str.maketrans({".": "", ",": "."})
+
 
 def parse_brazilian_value(value_str: str | None) -> tuple[float, str]:
     """Converte um valor contábil no formato brasileiro para (float, indicador).
@@ -34,52 +42,106 @@ def parse_brazilian_value(value_str: str | None) -> tuple[float, str]:
         >>> parse_brazilian_value(None)
         (0.0, '')
     """
-    # Tratar None, NaN e tipos não-string
+    # Fast path: a esmagadora maioria das células chega como string —
+    # testar isso primeiro evita três isinstance por célula boa
+    if type(value_str) is str:
+        cleaned = value_str.strip()
+
+        if not cleaned:
+            return (0.0, "")
+
+        # Extrair indicador D/C do final (sem normalizar via .upper())
+        indicator = ""
+        last = cleaned[-1]
+        if last in "Dd":
+            indicator = "D"
+            cleaned = cleaned[:-1].strip()
+        elif last in "Cc":
+            indicator = "C"
+            cleaned = cleaned[:-1].strip()
+
+        # Remove pontos (milhar) e troca vírgula por ponto numa passada C só
+        cleaned = cleaned.translate(_BRL_TRANSLATE)
+
+        # Remover caracteres estranhos restantes (exceto dígitos, ponto, sinal)
+        cleaned = _CLEAN_RE.sub("", cleaned)
+
+        if not cleaned:
+            return (0.0, "")
+
+        try:
+            value = float(cleaned)
+        except ValueError:
+            return (0.0, "")
+
+        return (value, indicator)
+
+    # Caminhos raros: None, NaN, subclasses de str e numéricos
     if value_str is None:
         return (0.0, "")
 
+    if isinstance(value_str, str):  # subclasse de str
+        return parse_brazilian_value(str(value_str))
+
     if isinstance(value_str, float) and math.isnan(value_str):
         return (0.0, "")
 
-    if not isinstance(value_str, str):
-        try:
-            return (float(value_str), "")
-        except (ValueError, TypeError):
-            return (0.0, "")
+    try:
+        return (float(value_str), "")
+    except (ValueError, TypeError):
+        return (0.0, "")
 
-    # Limpar espaços e caracteres invisíveis
-    cleaned = value_str.strip()
 
-    if not cleaned:
-        return (0.0, "")
+def parse_brazilian_series(s: pd.Series) -> tuple[pd.Series, pd.Series]:
+    """Versão vetorizada de :func:`parse_brazilian_value` para uma coluna.
 
-    # Extrair indicador D/C do final
-    indicator = ""
-    if cleaned.upper().endswith("D"):
-        indicator = "D"
-        cleaned = cleaned[:-1].strip()
-    elif cleaned.upper().endswith("C"):
-        indicator = "C"
-        cleaned = cleaned[:-1].strip()
+    Mesmas regras do helper escalar ("1.234,56D" → 1234.56 + "D"), mas
+    em meia dúzia de passadas C sobre a coluna inteira em vez de N
+    chamadas Python por célula.
 
-    # Remover pontos (separador de milhar)
-    cleaned = cleaned.replace(".", "")
+    Args:
+        s: Coluna com os valores crus (strings BRL, números ou NaN).
 
-    # Substituir vírgula (separador decimal) por ponto
-    cleaned = cleaned.replace(",", ".")
+    Returns:
+        Tupla ``(valores_absolutos, indicadores)``.
+    """
+    # Coluna já numérica: passa direto, como no escalar — str(1234.56)
+    # viraria "123456" no tratamento de separador de milhar
+    if pd.api.types.is_numeric_dtype(s):
+        return (
+            s.astype("float64").fillna(0.0),
+            pd.Series("", index=s.index, dtype=object),
+        )
 
-    # Remover caracteres estranhos restantes (exceto dígitos, ponto, sinal)
-    cleaned = re.sub(r"[^\d.\-]", "", cleaned)
+    txt = s.fillna("").astype(str).str.strip()
 
-    if not cleaned:
-        return (0.0, "")
+    last = txt.str[-1:].str.upper()
+    ind = last.where(last.isin(["D", "C"]), "")
+
+    num = txt.mask(ind != "", txt.str[:-1].str.strip())
+    num = (
+        num.str.replace(".", "", regex=False)  # separador de milhar
+        .str.replace(",", ".", regex=False)    # separador decimal
+        .str.replace(r"[^\d.\-]", "", regex=True)
+    )
+    val = pd.to_numeric(num, errors="coerce").fillna(0.0)
+
+    # Células numéricas numa coluna object mista também passam direto
+    if s.dtype == object:
+        mask = s.map(lambda v: isinstance(v, (int, float)) and v == v)
+        if mask.any():
+            val = val.mask(mask, s.where(mask).astype("float64"))
+
+    return val, ind
 
-    try:
-        value = float(cleaned)
-    except ValueError:
-        return (0.0, "")
 
-    return (value, indicator)
+# Tabela de sinais pré-computada: _SIGN[grupo][indicador] → fator.
+# Todos os grupos seguem a mesma convenção (D=+, C=-); a tabela troca
+# os dois branches por lookup e multiplicação, sem desvio por chamada.
+# As chaves minúsculas cobrem o casing sem pagar .upper() por célula
+_SIGN: dict[int, dict[str, float]] = {
+    grupo: {"D": 1.0, "C": -1.0, "d": 1.0, "c": -1.0} for grupo in (1, 2, 3, 4)
+}
 
 
 def apply_sign(value: float, indicator: str, account_group: int) -> float:
@@ -113,21 +175,23 @@ def apply_sign(value: float, indicator: str, account_group: int) -> float:
     if not indicator:
         return 0.0
 
-    indicator = indicator.upper().strip()
-
-    if account_group not in (1, 2, 3, 4):
+    signs = _SIGN.get(account_group)
+    if signs is None:
         raise ValueError(
             f"Grupo contábil inválido: {account_group}. Esperado: 1, 2, 3 ou 4."
         )
 
-    # Definir mapa de sinais: (grupo, indicador) → sinal
-    # Grupo 1 (ATIVO):   D=+, C=-
-    # Grupo 2 (PASSIVO): D=+, C=-
-    # Grupo 3 (RECEITA): D=+, C=-
-    # Grupo 4 (DESPESA): D=+, C=-
-    if indicator == "D":
-        return abs(value)
-    elif indicator == "C":
-        return -abs(value)
-    else:
-        return 0.0
+    fator = signs.get(indicator)
+    if fator is None:
+        # Caminho lento: indicador com espaços/casing fora do comum
+        fator = signs.get(indicator.strip().upper(), 0.0)
+    return abs(value) * fator
+
+
+def apply_sign_series(values: pd.Series, indicators: pd.Series) -> pd.Series:
+    """Versão vetorizada de :func:`apply_sign`: D → +|v|, C → -|v|, "" → 0."""
+    values = values.abs()
+    return pd.Series(
+        np.where(indicators == "D", values, np.where(indicators == "C", -values, 0.0)),
+        index=values.index,
+    )
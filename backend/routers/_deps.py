@@ -0,0 +1,31 @@
+"""
+Dependências compartilhadas entre os routers.
+"""
+
+from __future__ import annotations
+
+from fastapi import HTTPException, Request
+
+from backend.sheets.sheets_client import SheetsClient
+
+
+def get_sheets_client(request: Request) -> SheetsClient:
+    """Resolve o SheetsClient inicializado no lifespan do app.
+
+    Dependência única no lugar de um helper duplicado por router; o
+    acesso direto ao atributo (setado uma vez no startup) dispensa o
+    fallback do getattr com default no caminho quente.
+
+    Raises:
+        HTTPException: 503 se o cliente não foi inicializado.
+    """
+    try:
+        client = request.app.state.sheets_client
+    except AttributeError:
+        client = None
+    if client is None:
+        raise HTTPException(
+            status_code=503,
+            detail="SheetsClient não inicializado.",
+        )
+    return client
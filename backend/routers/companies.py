@@ -7,6 +7,7 @@ Estrutura preparada para expansão futura.
 
 from __future__ import annotations
 
+import asyncio
 import logging
 from typing import Any
 
@@ -20,25 +21,29 @@ logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/api/companies", tags=["companies"])
 
 # ── Armazenamento em memória (futuro: banco de dados) ──
-_companies: list[dict[str, Any]] = []
+# Dict indexado por id: insert/lookup O(1) em vez do scan de max(id)
+# por POST (e já deixa PUT/DELETE futuros em tempo constante)
+_companies: dict[int, dict[str, Any]] = {}
+_next_id = 1
 _initialized = False
+# Serializa a alocação de ids sob POSTs concorrentes
+_create_lock = asyncio.Lock()
 
 
 def _ensure_default():
     """Garante que a empresa padrão (do .env) esteja na lista."""
-    global _initialized
+    global _initialized, _next_id
     if _initialized:
         return
     settings = get_settings()
-    _companies.append(
-        {
-            "id": 1,
-            "nome": "Empresa Padrão",
-            "cnpj": "",
-            "sheets_id": settings.sheets_id_default,
-            "active": True,
-        }
-    )
+    _companies[1] = {
+        "id": 1,
+        "nome": "Empresa Padrão",
+        "cnpj": "",
+        "sheets_id": settings.sheets_id_default,
+        "active": True,
+    }
+    _next_id = 2
     _initialized = True
 
 
@@ -53,7 +58,7 @@ class CompanyCreate(BaseModel):
 async def list_companies():
     """Lista empresas configuradas."""
     _ensure_default()
-    return {"companies": _companies}
+    return {"companies": list(_companies.values())}
 
 
 @router.post("")
@@ -61,16 +66,19 @@ async def create_company(body: CompanyCreate):
     """Configura uma nova empresa."""
     _ensure_default()
 
-    new_id = max(c["id"] for c in _companies) + 1 if _companies else 1
+    async with _create_lock:
+        global _next_id
+        new_id = _next_id
+        _next_id += 1
 
-    company: dict[str, Any] = {
-        "id": new_id,
-        "nome": body.nome,
-        "cnpj": body.cnpj,
-        "sheets_id": body.sheets_id,
-        "active": True,
-    }
-    _companies.append(company)
+        company: dict[str, Any] = {
+            "id": new_id,
+            "nome": body.nome,
+            "cnpj": body.cnpj,
+            "sheets_id": body.sheets_id,
+            "active": True,
+        }
+        _companies[new_id] = company
 
     logger.info("Nova empresa cadastrada: %s (ID %d)", body.nome, new_id)
     return {"company": company, "message": "Empresa criada com sucesso."}
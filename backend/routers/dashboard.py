@@ -7,13 +7,33 @@ formatado para o frontend. Cache de 5 minutos via ``cachetools.TTLCache``.
 
 from __future__ import annotations
 
+import asyncio
+import hashlib
 import logging
-from typing import Any
+from typing import Any, Callable
 
+import pandas as pd
 from cachetools import TTLCache
-from fastapi import APIRouter, Query, Request, HTTPException
+from fastapi import APIRouter, Query, Request, HTTPException, Response
+from starlette.concurrency import run_in_threadpool
 
-from backend.sheets.sheets_client import SheetsClient
+try:  # serialização ~5× mais rápida e com suporte nativo a numpy
+    import orjson
+
+    def _dumps(obj: Any) -> bytes:
+        return orjson.dumps(obj, option=orjson.OPT_SERIALIZE_NUMPY)
+
+except ImportError:  # pragma: no cover - fallback stdlib
+    import json
+
+    def _np_default(o: Any) -> Any:
+        item = getattr(o, "item", None)
+        return item() if item is not None else str(o)
+
+    def _dumps(obj: Any) -> bytes:
+        return json.dumps(obj, ensure_ascii=False, default=_np_default).encode()
+
+from backend.routers._deps import get_sheets_client
 from backend.sheets.base_writer import BaseWriter
 from backend.sheets.dre_builder import DREBuilder
 from backend.sheets.bp_builder import BPBuilder
@@ -26,22 +46,114 @@ router = APIRouter(prefix="/api/data", tags=["dashboard"])
 # Cache com TTL de 5 minutos, até 50 entradas
 _cache: TTLCache = TTLCache(maxsize=50, ttl=300)
 
-
-def _get_sheets_client(request: Request) -> SheetsClient:
-    client = getattr(request.app.state, "sheets_client", None)
-    if client is None:
-        raise HTTPException(
-            status_code=503,
-            detail="SheetsClient não inicializado.",
-        )
-    return client
+# Estruturas dos demonstrativos são fixas: montadas uma vez no import,
+# não a cada request (se virarem dinâmicas por empresa, trocar por uma
+# factory com lru_cache)
+_DRE_STRUCTURE = DREBuilder.get_structure()
+_BP_STRUCTURE = BPBuilder.get_structure()
+_DFC_STRUCTURE = DFCBuilder.get_structure()
+
+# Um lock por chave: quando o TTL expira, só uma corrotina refaz a
+# chamada ao Sheets; as demais aguardam e recebem o resultado fresco
+# (sem thundering herd de N requests simultâneos na mesma chave).
+# Mesmos limites do _cache — as chaves derivam do query param `year`,
+# então um defaultdict cresceria sem teto com valores arbitrários.
+_locks: TTLCache = TTLCache(maxsize=50, ttl=300)
+
+
+def _lock_for(key: str) -> asyncio.Lock:
+    """Retorna (criando se preciso) o lock da chave.
+
+    Sem await entre o get e o set, a criação é atômica no event loop.
+    Se um lock for despejado enquanto alguém o segura, o pior caso é
+    uma busca duplicada ao Sheets — nunca corrupção.
+    """
+    lock = _locks.get(key)
+    if lock is None:
+        lock = _locks[key] = asyncio.Lock()
+    return lock
+
+
+class _Uncached:
+    """Marca um resultado que não deve entrar no cache (ex.: DRE vazia)."""
+
+    __slots__ = ("value",)
+
+    def __init__(self, value: Any) -> None:
+        self.value = value
+
+
+def _etag_response(
+    blob: bytes, etag: str, if_none_match: str | None
+) -> Response:
+    """Monta a resposta com ETag, ou 304 se o cliente já tem esse corpo.
+
+    Segue a RFC 7232: o ETag vai no header como quoted-string e o
+    If-None-Match é tratado como lista de entity-tags (aceitando ``*``
+    e o prefixo ``W/`` de tags fracas), não como substring.
+    """
+    quoted = f'"{etag}"'
+    if if_none_match is not None:
+        for tag in if_none_match.split(","):
+            tag = tag.strip()
+            if tag == "*" or tag.removeprefix("W/") == quoted:
+                return Response(status_code=304, headers={"ETag": quoted})
+    return Response(
+        content=blob,
+        media_type="application/json",
+        headers={"ETag": quoted, "Cache-Control": "max-age=60"},
+    )
+
+
+async def _cached_json(
+    key: str, build_fn: Callable[[], Any], request: Request
+) -> Response:
+    """Busca ``key`` no cache ou constrói o resultado uma única vez.
+
+    ``build_fn`` é síncrona (chamadas ao Google Sheets) e roda no
+    threadpool do Starlette para não bloquear o event loop. O cache
+    guarda ``(bytes, etag)`` já serializados: um hit vira um memcpy —
+    ou um 304 sem corpo nenhum, quando o ``If-None-Match`` do cliente
+    bate com o ETag (hash blake2b dos próprios bytes).
+    """
+    if_none_match = request.headers.get("if-none-match")
+    entry = _cache.get(key)
+    if entry is not None:
+        return _etag_response(entry[0], entry[1], if_none_match)
+    async with _lock_for(key):
+        # Double-check: outra corrotina pode ter populado enquanto
+        # esperávamos o lock
+        entry = _cache.get(key)
+        if entry is None:
+            result = await run_in_threadpool(build_fn)
+            if isinstance(result, _Uncached):
+                blob = _dumps(result.value)
+                etag = hashlib.blake2b(blob, digest_size=16).hexdigest()
+                return _etag_response(blob, etag, if_none_match)
+            blob = _dumps(result)
+            entry = (blob, hashlib.blake2b(blob, digest_size=16).hexdigest())
+            _cache[key] = entry
+    return _etag_response(entry[0], entry[1], if_none_match)
 
 
 def _df_to_records(df) -> list[dict[str, Any]]:
-    """Converte DataFrame para lista de dicts, tratando NaN."""
+    """Converte DataFrame para lista de dicts, tratando NaN.
+
+    Sem o ``fillna("")``, que alocava uma cópia inteira do frame só
+    para limpar NaN antes da serialização — a maior alocação do caminho
+    de resposta. ``v != v`` detecta NaN sem isinstance; None/pd.NA são
+    tratados à parte e o resto passa direto.
+    """
     if df.empty:
         return []
-    return df.fillna("").to_dict(orient="records")
+    cols = df.columns.tolist()
+    return [
+        {
+            c: ("" if v is None or v is pd.NA or v != v else v)
+            for c, v in zip(cols, row)
+        }
+        for row in df.itertuples(index=False, name=None)
+    ]
 
 
 def _filter_by_year(records: list[dict], year: str) -> list[dict]:
@@ -54,24 +166,19 @@ def _filter_by_year(records: list[dict], year: str) -> list[dict]:
 @router.get("/dre")
 async def get_dre(request: Request, year: str = Query(default="2025")):
     """Retorna a DRE completa em formato JSON."""
-    cache_key = f"dre_{year}"
-    if cache_key in _cache:
-        return _cache[cache_key]
-
-    sheets_client = _get_sheets_client(request)
-    dre = DREBuilder(sheets_client)
+    sheets_client = get_sheets_client(request)
 
-    try:
-        df = dre.get_dre_data()
-        data = _df_to_records(df)
-        result = {
+    def _build() -> dict[str, Any]:
+        df = DREBuilder(sheets_client).get_dre_data()
+        return {
             "statement": "DRE",
             "year": year,
-            "rows": data,
-            "structure": DREBuilder.get_structure(),
+            "rows": _df_to_records(df),
+            "structure": _DRE_STRUCTURE,
         }
-        _cache[cache_key] = result
-        return result
+
+    try:
+        return await _cached_json(f"dre_{year}", _build, request)
     except Exception as exc:
         logger.exception("Erro ao ler DRE")
         raise HTTPException(status_code=500, detail=str(exc))
@@ -80,24 +187,19 @@ async def get_dre(request: Request, year: str = Query(default="2025")):
 @router.get("/bp")
 async def get_bp(request: Request, year: str = Query(default="2025")):
     """Retorna o Balanço Patrimonial completo em formato JSON."""
-    cache_key = f"bp_{year}"
-    if cache_key in _cache:
-        return _cache[cache_key]
-
-    sheets_client = _get_sheets_client(request)
-    bp = BPBuilder(sheets_client)
+    sheets_client = get_sheets_client(request)
 
-    try:
-        df = bp.get_bp_data()
-        data = _df_to_records(df)
-        result = {
+    def _build() -> dict[str, Any]:
+        df = BPBuilder(sheets_client).get_bp_data()
+        return {
             "statement": "BP",
             "year": year,
-            "rows": data,
-            "structure": BPBuilder.get_structure(),
+            "rows": _df_to_records(df),
+            "structure": _BP_STRUCTURE,
         }
-        _cache[cache_key] = result
-        return result
+
+    try:
+        return await _cached_json(f"bp_{year}", _build, request)
     except Exception as exc:
         logger.exception("Erro ao ler BP")
         raise HTTPException(status_code=500, detail=str(exc))
@@ -106,24 +208,19 @@ async def get_bp(request: Request, year: str = Query(default="2025")):
 @router.get("/dfc")
 async def get_dfc(request: Request, year: str = Query(default="2025")):
     """Retorna a DFC completa em formato JSON."""
-    cache_key = f"dfc_{year}"
-    if cache_key in _cache:
-        return _cache[cache_key]
+    sheets_client = get_sheets_client(request)
 
-    sheets_client = _get_sheets_client(request)
-    dfc = DFCBuilder(sheets_client)
-
-    try:
-        df = dfc.get_dfc_data()
-        data = _df_to_records(df)
-        result = {
+    def _build() -> dict[str, Any]:
+        df = DFCBuilder(sheets_client).get_dfc_data()
+        return {
             "statement": "DFC",
             "year": year,
-            "rows": data,
-            "structure": DFCBuilder.get_structure(),
+            "rows": _df_to_records(df),
+            "structure": _DFC_STRUCTURE,
         }
-        _cache[cache_key] = result
-        return result
+
+    try:
+        return await _cached_json(f"dfc_{year}", _build, request)
     except Exception as exc:
         logger.exception("Erro ao ler DFC")
         raise HTTPException(status_code=500, detail=str(exc))
@@ -132,51 +229,34 @@ async def get_dfc(request: Request, year: str = Query(default="2025")):
 @router.get("/indicators")
 async def get_indicators(request: Request, year: str = Query(default="2025")):
     """Calcula e retorna indicadores financeiros baseados na DRE."""
-    cache_key = f"indicators_{year}"
-    if cache_key in _cache:
-        return _cache[cache_key]
+    sheets_client = get_sheets_client(request)
 
-    sheets_client = _get_sheets_client(request)
-    dre = DREBuilder(sheets_client)
-
-    try:
-        df = dre.get_dre_data()
+    def _build() -> Any:
+        df = DREBuilder(sheets_client).get_dre_data()
         if df.empty:
-            return {"year": year, "indicators": {}}
+            return _Uncached({"year": year, "indicators": {}})
 
         # Tentar extrair indicadores das linhas da DRE
         # As linhas são indexadas pela coluna A (label)
         indicators: dict[str, Any] = {"year": year}
 
-        # Converter para dict por label para acesso rápido
-        records = _df_to_records(df)
-        by_label: dict[str, dict] = {}
-        for row in records:
-            label = str(row.get(df.columns[0], "")).strip() if df.columns[0] in row else ""
-            if not label:
-                # Tentar primeira coluna
-                first_col = list(row.keys())[0] if row else ""
-                label = str(row.get(first_col, "")).strip()
-            if label:
-                by_label[label] = row
-
-        # Extrair valores numéricos das colunas de meses
+        # Série de totais indexada pelo label: uma passada de
+        # to_numeric sobre a coluna Total substitui a materialização
+        # de records + by_label + fallback por linha
+        labels = df[df.columns[0]].astype(str).str.strip()
+        total_col = next(
+            (c for c in ("Total", "TOTAL", "Acumulado") if c in df.columns),
+            df.columns[-1],
+        )
+        totals = pd.to_numeric(df[total_col], errors="coerce").fillna(0.0)
+        totals.index = labels
+        # Labels duplicados: a última ocorrência vence, como no dict
+        totals = totals[~totals.index.duplicated(keep="last")]
+
         def _get_total(label_name: str) -> float:
-            """Obtém o valor da coluna Total ou da última coluna numérica."""
-            row_data = by_label.get(label_name, {})
-            for key in ["Total", "TOTAL", "Acumulado"]:
-                if key in row_data:
-                    try:
-                        return float(row_data[key])
-                    except (ValueError, TypeError):
-                        pass
-            # Fallback: última coluna numérica
-            for val in reversed(list(row_data.values())):
-                try:
-                    return float(val)
-                except (ValueError, TypeError):
-                    continue
-            return 0.0
+            """Obtém o valor da linha na coluna de totais."""
+            val = totals.get(label_name)
+            return float(val) if val is not None else 0.0
 
         receita_bruta = _get_total("Receita Bruta de Serviços")
         receita_liquida = _get_total("Receita Líquida")
@@ -217,9 +297,10 @@ async def get_indicators(request: Request, year: str = Query(default="2025")):
             "lucro_liquido": lucro_liquido,
         }
 
-        _cache[cache_key] = indicators
         return indicators
 
+    try:
+        return await _cached_json(f"indicators_{year}", _build, request)
     except Exception as exc:
         logger.exception("Erro ao calcular indicadores")
         raise HTTPException(status_code=500, detail=str(exc))
@@ -228,14 +309,10 @@ async def get_indicators(request: Request, year: str = Query(default="2025")):
 @router.get("/summary")
 async def get_summary(request: Request):
     """Resumo geral: períodos disponíveis, empresa, última atualização."""
-    cache_key = "summary"
-    if cache_key in _cache:
-        return _cache[cache_key]
-
-    sheets_client = _get_sheets_client(request)
-    base_writer = BaseWriter(sheets_client)
+    sheets_client = get_sheets_client(request)
 
-    try:
+    def _build() -> dict[str, Any]:
+        base_writer = BaseWriter(sheets_client)
         periods = base_writer.get_existing_periods()
         all_data = base_writer.get_all_data()
 
@@ -244,16 +321,15 @@ async def get_summary(request: Request):
             # Empresa pode estar nos metadados ou no header original
             pass
 
-        result: dict[str, Any] = {
+        return {
             "periods": periods,
             "empresa": empresa,
             "total_rows": len(all_data),
             "years": sorted(set(p[:4] for p in periods)) if periods else [],
         }
 
-        _cache[cache_key] = result
-        return result
-
+    try:
+        return await _cached_json("summary", _build, request)
     except Exception as exc:
         logger.exception("Erro ao gerar resumo")
         raise HTTPException(status_code=500, detail=str(exc))
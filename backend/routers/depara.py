@@ -7,41 +7,57 @@ from __future__ import annotations
 import logging
 from typing import Any
 
-from fastapi import APIRouter, Request, HTTPException
+from cachetools import TTLCache
+from fastapi import APIRouter, Request, HTTPException, Response
 from pydantic import BaseModel
+from starlette.concurrency import run_in_threadpool
 
+from backend.routers._deps import get_sheets_client
 from backend.classifier.depara_manager import DEPARAManager
 from backend.sheets.base_writer import BaseWriter
 
+try:  # serialização ~5× mais rápida e com suporte nativo a numpy
+    import orjson
+
+    def _dumps(obj: Any) -> bytes:
+        return orjson.dumps(obj, option=orjson.OPT_SERIALIZE_NUMPY)
+
+except ImportError:  # pragma: no cover - fallback stdlib
+    import json
+
+    def _dumps(obj: Any) -> bytes:
+        return json.dumps(obj, ensure_ascii=False, default=str).encode()
+
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/api/depara", tags=["depara"])
 
+# Respostas GET pré-serializadas com TTL curto: o DEPARA muda pouco e
+# cada miss custa um roundtrip ao Sheets; o PUT invalida tudo
+_cache: TTLCache = TTLCache(maxsize=4, ttl=60)
+
 
 class UpdateClassificationBody(BaseModel):
     """Corpo para atualização de classificação."""
     classificacao: str
 
 
-def _get_sheets_client(request: Request):
-    client = getattr(request.app.state, "sheets_client", None)
-    if client is None:
-        raise HTTPException(
-            status_code=503, detail="SheetsClient não inicializado."
-        )
-    return client
-
-
 @router.get("")
 async def get_depara(request: Request):
     """Retorna lista completa do DEPARA."""
-    sheets_client = _get_sheets_client(request)
+    blob = _cache.get("full")
+    if blob is not None:
+        return Response(content=blob, media_type="application/json")
+
+    sheets_client = get_sheets_client(request)
     depara_mgr = DEPARAManager(sheets_client)
 
     try:
         df = depara_mgr.get_full_depara()
         records = df.fillna("").to_dict(orient="records") if not df.empty else []
-        return {"depara": records, "total": len(records)}
+        blob = _dumps({"depara": records, "total": len(records)})
+        _cache["full"] = blob
+        return Response(content=blob, media_type="application/json")
     except Exception as exc:
         logger.exception("Erro ao ler DEPARA")
         raise HTTPException(status_code=500, detail=str(exc))
@@ -59,20 +75,40 @@ async def update_depara(
     Propaga a atualização para a Base Balancete. Se a classificação
     for nova, ela será usada nos próximos builds de DRE/BP.
     """
-    sheets_client = _get_sheets_client(request)
+    sheets_client = get_sheets_client(request)
     depara_mgr = DEPARAManager(sheets_client)
     base_writer = BaseWriter(sheets_client)
 
-    try:
-        # Atualizar no DEPARA
-        depara_result = depara_mgr.update_classification(
+    def _apply() -> tuple[dict[str, Any], int]:
+        batch = getattr(sheets_client, "batch_update_values", None)
+        if batch is None:
+            # Client sem batch: duas round trips, como antes
+            depara_result = depara_mgr.update_classification(
+                codigo_conta, body.classificacao
+            )
+            updated_rows = base_writer.update_classifications(
+                codigo_conta, body.classificacao
+            )
+            return depara_result, updated_rows
+
+        # DEPARA + Base Balancete numa única chamada batchUpdate
+        dep_update, depara_result = depara_mgr.build_classification_update(
             codigo_conta, body.classificacao
         )
-
-        # Propagar para Base Balancete
-        updated_rows = base_writer.update_classifications(
+        base_updates, updated_rows = base_writer.build_classifications_update(
             codigo_conta, body.classificacao
         )
+        updates = ([dep_update] if dep_update else []) + base_updates
+        if updates:
+            batch(updates)
+            if dep_update:
+                depara_mgr.apply_local_update(
+                    codigo_conta, body.classificacao, depara_result["grupo_df"]
+                )
+        return depara_result, updated_rows
+
+    try:
+        depara_result, updated_rows = await run_in_threadpool(_apply)
 
         result: dict[str, Any] = {
             "codigo_conta": codigo_conta,
@@ -88,6 +124,9 @@ async def update_depara(
             updated_rows,
         )
 
+        # Invalida as respostas GET cacheadas
+        _cache.clear()
+
         return result
 
     except Exception as exc:
@@ -98,12 +137,18 @@ async def update_depara(
 @router.get("/pending")
 async def get_pending(request: Request):
     """Retorna contas pendentes de revisão."""
-    sheets_client = _get_sheets_client(request)
+    blob = _cache.get("pending")
+    if blob is not None:
+        return Response(content=blob, media_type="application/json")
+
+    sheets_client = get_sheets_client(request)
     depara_mgr = DEPARAManager(sheets_client)
 
     try:
         pending = depara_mgr.get_pending_reviews()
-        return {"pending": pending, "total": len(pending)}
+        blob = _dumps({"pending": pending, "total": len(pending)})
+        _cache["pending"] = blob
+        return Response(content=blob, media_type="application/json")
     except Exception as exc:
         logger.exception("Erro ao buscar pendentes")
         raise HTTPException(status_code=500, detail=str(exc))
@@ -23,6 +23,7 @@ from typing import Any
 
 from fastapi import APIRouter, Request, UploadFile, File, HTTPException
 
+from backend.routers._deps import get_sheets_client
 from backend.parsers.balancete_parser import parse_balancete
 from backend.validators.hierarchy_validator import (
     validate_hierarchy,
@@ -45,16 +46,6 @@ _recent_processings: list[dict[str, Any]] = []
 _MAX_RECENT = 20
 
 
-def _get_sheets_client(request: Request):
-    client = getattr(request.app.state, "sheets_client", None)
-    if client is None:
-        raise HTTPException(
-            status_code=503,
-            detail="SheetsClient não inicializado. Verifique credenciais.",
-        )
-    return client
-
-
 @router.post("/upload")
 async def upload_file(request: Request, file: UploadFile = File(...)):
     """
@@ -133,7 +124,7 @@ async def upload_file(request: Request, file: UploadFile = File(...)):
             )
 
         # ── 4. Classificar contas (DEPARA) ──
-        sheets_client = _get_sheets_client(request)
+        sheets_client = get_sheets_client(request)
         depara_mgr = DEPARAManager(sheets_client)
 
         logger.info("Classificando contas via DEPARA...")
@@ -156,11 +147,11 @@ async def upload_file(request: Request, file: UploadFile = File(...)):
             )
             accounts_for_ai = [
                 {
-                    "codigo_conta": str(row["codigo_conta"]),
-                    "titulo_conta": str(row["titulo_conta"]),
-                    "grupo": str(row.get("grupo", "")),
+                    "codigo_conta": str(row.codigo_conta),
+                    "titulo_conta": str(row.titulo_conta),
+                    "grupo": str(getattr(row, "grupo", "")),
                 }
-                for _, row in unclassified.iterrows()
+                for row in unclassified.itertuples(index=False)
             ]
 
             existing_cls = depara_mgr.get_all_classifications()
@@ -176,12 +167,16 @@ async def upload_file(request: Request, file: UploadFile = File(...)):
                     accounts_for_ai, existing_cls
                 )
 
-            # Aplicar classificações da IA no DataFrame
+            # Aplicar classificações da IA no DataFrame (volta a object:
+            # a coluna categórica não aceita rótulos novos vindos da IA)
+            df["classificacao_depara"] = df["classificacao_depara"].astype(
+                object
+            )
             ai_map = {r["codigo_conta"]: r for r in ai_results}
-            for idx, row in df.iterrows():
-                code = str(row["codigo_conta"])
+            for row in df.itertuples():
+                code = str(row.codigo_conta)
                 if code in ai_map and ai_map[code].get("classificacao"):
-                    df.at[idx, "classificacao_depara"] = ai_map[code][
+                    df.at[row.Index, "classificacao_depara"] = ai_map[code][
                         "classificacao"
                     ]
 
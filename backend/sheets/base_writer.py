@@ -36,6 +36,7 @@ HEADERS = [
 
 # Índice 1-based da coluna classificacao_depara (coluna J)
 _COL_CLASSIFICACAO = HEADERS.index("classificacao_depara") + 1
+_COL_CLASSIFICACAO_LETTER = chr(ord("A") + _COL_CLASSIFICACAO - 1)
 # Índice 1-based da coluna periodo (coluna F)
 _COL_PERIODO = HEADERS.index("periodo") + 1
 
@@ -55,23 +56,25 @@ class BaseWriter:
     def _df_to_rows(df: pd.DataFrame) -> list[list[Any]]:
         """Converte DataFrame para lista de listas na ordem dos HEADERS."""
         rows: list[list[Any]] = []
-        for _, r in df.iterrows():
+        # itertuples devolve namedtuples — sem criar uma Series por linha
+        for r in df.itertuples(index=False):
+            nivel = getattr(r, "nivel", None)
+            saldo_original = getattr(r, "saldo_original", None)
+            saldo_sinalizado = getattr(r, "saldo_sinalizado", None)
             rows.append(
                 [
-                    str(r.get("codigo_conta", "")),
-                    str(r.get("titulo_conta", "")),
-                    int(r["nivel"]) if pd.notna(r.get("nivel")) else "",
-                    str(r.get("tipo", "")),
-                    str(r.get("grupo", "")),
-                    str(r.get("periodo", "")),
-                    float(r["saldo_original"])
-                    if pd.notna(r.get("saldo_original"))
+                    str(getattr(r, "codigo_conta", "")),
+                    str(getattr(r, "titulo_conta", "")),
+                    int(nivel) if pd.notna(nivel) else "",
+                    str(getattr(r, "tipo", "")),
+                    str(getattr(r, "grupo", "")),
+                    str(getattr(r, "periodo", "")),
+                    float(saldo_original) if pd.notna(saldo_original) else "",
+                    str(getattr(r, "indicador_dc", "")),
+                    float(saldo_sinalizado)
+                    if pd.notna(saldo_sinalizado)
                     else "",
-                    str(r.get("indicador_dc", "")),
-                    float(r["saldo_sinalizado"])
-                    if pd.notna(r.get("saldo_sinalizado"))
-                    else "",
-                    str(r.get("classificacao_depara", "")),
+                    str(getattr(r, "classificacao_depara", "")),
                 ]
             )
         return rows
@@ -226,3 +229,57 @@ class BaseWriter:
             count,
         )
         return count
+
+    def build_classifications_update(
+        self, codigo_conta: str, nova_classificacao: str
+    ) -> tuple[list[dict[str, Any]], int]:
+        """
+        Monta os ranges de atualização de ``classificacao_depara`` sem
+        escrever — variante de :meth:`update_classifications` para uso
+        com ``batch_update_values``.
+
+        Em vez de reescrever a aba inteira, só a coluna da classificação
+        das linhas afetadas entra no batch; linhas contíguas são
+        compactadas num range único.
+
+        Returns:
+            Tupla ``(updates, count)`` com os dicts
+            ``{"range": ..., "values": ...}`` e o número de linhas.
+        """
+        df = self._read_existing()
+        if df.empty:
+            return [], 0
+
+        mask = df["codigo_conta"].astype(str) == str(codigo_conta)
+        count = int(mask.sum())
+
+        if count == 0:
+            logger.warning(
+                "Conta '%s' não encontrada na Base Balancete.", codigo_conta
+            )
+            return [], 0
+
+        # Linhas no Sheets (offset +2: header + 1-indexed), compactando
+        # sequências contíguas num range só
+        col = _COL_CLASSIFICACAO_LETTER
+        sheet_rows = [int(i) + 2 for i in df.index[mask]]
+        updates: list[dict[str, Any]] = []
+        start = prev = sheet_rows[0]
+        for row in sheet_rows[1:]:
+            if row == prev + 1:
+                prev = row
+                continue
+            updates.append(
+                {
+                    "range": f"'{SHEET_NAME}'!{col}{start}:{col}{prev}",
+                    "values": [[nova_classificacao]] * (prev - start + 1),
+                }
+            )
+            start = prev = row
+        updates.append(
+            {
+                "range": f"'{SHEET_NAME}'!{col}{start}:{col}{prev}",
+                "values": [[nova_classificacao]] * (prev - start + 1),
+            }
+        )
+        return updates, count
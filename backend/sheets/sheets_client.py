@@ -236,6 +236,24 @@ class SheetsClient:
             len(values),
         )
 
+    def batch_update_values(self, updates: list[dict]) -> None:
+        """
+        Atualiza múltiplos ranges numa única chamada ``values.batchUpdate``.
+
+        Cada round trip ao Sheets custa 100-500 ms; agrupar escritas
+        independentes numa chamada só corta latência e consumo de quota.
+
+        Args:
+            updates: Lista de dicts ``{"range": "Aba!A1:B2", "values": [[...]]}``.
+        """
+        if not updates:
+            return
+        body = {"valueInputOption": "USER_ENTERED", "data": updates}
+        self._call_with_retry(lambda: self._spreadsheet.values_batch_update(body))
+        logger.info(
+            "Batch update de %d ranges numa única chamada.", len(updates)
+        )
+
     def write_formula(
         self, sheet_name: str, row: int, col: int, formula: str
     ) -> None:
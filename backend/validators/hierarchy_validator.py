@@ -53,11 +53,11 @@ def validate_hierarchy(df: pd.DataFrame) -> list[dict]:
     # Indexar todas as contas por código para busca rápida
     all_codes = set(df["codigo_conta"].values)
 
-    for _, row in macros.iterrows():
-        codigo_pai: str = row["codigo_conta"]
-        titulo_pai: str = row["titulo_conta"]
-        saldo_pai: float = float(row["saldo_atual"])
-        nivel_pai: int = int(row["nivel"])
+    for row in macros.itertuples(index=False):
+        codigo_pai: str = row.codigo_conta
+        titulo_pai: str = row.titulo_conta
+        saldo_pai: float = float(row.saldo_atual)
+        nivel_pai: int = int(row.nivel)
         nivel_filho_direto = nivel_pai + 1
 
         # Encontrar filhos diretos: começam com "codigo_pai." e têm nível = pai + 1
@@ -247,15 +247,15 @@ def validate_level_classification(df: pd.DataFrame) -> list[dict]:
     ultimo_nivel = df[df["tipo"] == "Último Nível"]
     all_codes = df["codigo_conta"].values
 
-    for _, row in ultimo_nivel.iterrows():
-        codigo: str = row["codigo_conta"]
+    for row in ultimo_nivel.itertuples(index=False):
+        codigo: str = row.codigo_conta
         prefix = codigo + "."
 
         # Buscar contas que começam com este prefix
         filhos = df[df["codigo_conta"].str.startswith(prefix)]
 
         if not filhos.empty:
-            titulo = row.get("titulo_conta", "")
+            titulo = getattr(row, "titulo_conta", "")
             filhos_codes = filhos["codigo_conta"].tolist()
             errors.append(
                 {